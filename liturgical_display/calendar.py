@@ -1,25 +1,50 @@
 #!/usr/bin/env python3
-import yaml
-import os
 import sys
 import subprocess
+from datetime import date
 from .utils import log
 
-def load_config():
-    config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yaml')
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+# liturgical-calendar ImageService, created on first use and reused afterwards
+_image_service = None
+
+def _generate_with_cli(output_path, date_str):
+    """Generate the image with the liturgical-calendar CLI in a subprocess."""
+    subprocess.run([
+        sys.executable, '-m', 'liturgical_calendar.cli', 'generate',
+        date_str, '--output', str(output_path)
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+def generate_liturgical_image(output_path, date_str=None):
+    """Generate the liturgical image for date_str (default: today) at output_path.
+
+    Calls the liturgical-calendar API in-process, which avoids starting a second
+    interpreter and re-importing the package for every image. Falls back to the
+    CLI in a subprocess if the API is missing or doesn't match the installed
+    version (ImportError, AttributeError, TypeError).
+    """
+    global _image_service
+    if date_str is None:
+        date_str = date.today().isoformat()
+    try:
+        from liturgical_calendar.services.image_service import ImageService
+        if _image_service is None:
+            _image_service = ImageService()
+        result = _image_service.generate_liturgical_image(date_str, str(output_path))
+    except (ImportError, AttributeError, TypeError) as e:
+        log("[calendar.py] In-process image API unavailable (%s); using the CLI", e)
+        _generate_with_cli(output_path, date_str)
+        return
+    if isinstance(result, dict) and not result.get('success', True):
+        raise RuntimeError(result.get('error', 'Image generation failed'))
 
 def render_today(output_path, cache_dir):
     try:
-        # Call the CLI directly, no custom FONTS_DIR logic
-        subprocess.run([
-            sys.executable, '-m', 'liturgical_calendar.cli', 'generate', '--output', output_path
-        ], check=True)
-        log(f"[calendar.py] Rendered image: {output_path}")
+        # No custom FONTS_DIR logic, the package handles its own fonts and caching
+        generate_liturgical_image(output_path)
+        log("[calendar.py] Rendered image: %s", output_path)
     except Exception as e:
-        log(f"[calendar.py] ERROR rendering image: {e}")
+        log("[calendar.py] ERROR rendering image: %s", e)
         raise
 
 if __name__ == "__main__":
-    render_today() 
\ No newline at end of file
+    render_today() 
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
-import yaml
 import os
 import sys
 import subprocess
 import shutil
 
-def load_config():
-    config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yaml')
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+from .utils import load_config, log as print_log
+
+# epdraw binary, resolved on first use
+_EPDRAW_PATH = None
+
+def get_epdraw_path():
+    """Return the epdraw binary: the one on $PATH, else the bundled bin/epdraw."""
+    global _EPDRAW_PATH
+    if _EPDRAW_PATH is None:
+        _EPDRAW_PATH = shutil.which('epdraw') or os.path.join('bin', 'epdraw')
+    return _EPDRAW_PATH
 
 def display_image(image_path=None, config=None, logger=None):
     """Display image on eInk using epdraw. Logs to logger if provided."""
@@ -18,12 +24,10 @@ def display_image(image_path=None, config=None, logger=None):
         image_path = config.get('output_image', 'today.png')
     vcom = str(config.get('vcom', '-2.51')).replace('-', '')  # epdraw expects e.g. 251 for -2.51V
     vcom_arg = vcom if vcom else '251'
-    log = logger.info if logger else print
-    log(f"[display.py] Displaying image {image_path} with VCOM -{vcom_arg}")
+    log = logger.info if logger else print_log
+    log("[display.py] Displaying image %s with VCOM -%s", image_path, vcom_arg)
     try:
-        epdraw_path = 'epdraw'
-        if not shutil.which(epdraw_path):
-            epdraw_path = os.path.join('bin', 'epdraw')
+        epdraw_path = get_epdraw_path()
         # Mode 2 (GC16) is required for the Waveshare 10.3" eInk display (IT8951)
         # Do not change unless you have a different display or special requirements
         subprocess.run([
@@ -33,7 +37,7 @@ def display_image(image_path=None, config=None, logger=None):
             vcom_arg,
             '2'  # GC16 mode (best quality for 10.3" display)
         ], check=True)
-        log(f"[display.py] Displayed image: {image_path}")
+        log("[display.py] Displayed image: %s", image_path)
         return True
     except Exception as e:
         msg = f"[display.py] ERROR displaying image: {e}"
@@ -1,34 +1,54 @@
 #!/usr/bin/env python3
-import yaml
 import os
 import sys
 import subprocess
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
+import logging.config
 
 from .updater import update_calendar_package
 from .calendar import render_today
 from .display import display_image
+from .utils import load_config
 
-def load_config():
-    config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yml')
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+# Logging spec for the display run; the file handler's filename is filled in
+# from config by setup_logging()
+_LOG_CFG = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {'format': '[%(asctime)s] %(levelname)s: %(message)s'},
+    },
+    'handlers': {
+        'file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'formatter': 'default',
+            'maxBytes': 1_000_000,
+            'backupCount': 3,
+        },
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'default',
+        },
+    },
+    'loggers': {
+        'liturgical_display': {
+            'level': 'INFO',
+            'handlers': ['file', 'console'],
+        },
+    },
+}
 
 def setup_logging(config):
+    logger = logging.getLogger("liturgical_display")
+    if logger.handlers:
+        # Already configured in this process; don't add duplicate handlers
+        return logger
     log_path = config.get('log_file', 'logs/display.log')
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
-    logger = logging.getLogger("liturgical_display")
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s')
-    # File handler
-    fh = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-    # Console handler
-    ch = logging.StreamHandler()
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    log_cfg = copy.deepcopy(_LOG_CFG)
+    log_cfg['handlers']['file']['filename'] = log_path
+    logging.config.dictConfig(log_cfg)
     return logger
 
 def main():
@@ -39,7 +59,7 @@ def main():
     logger.info("Loaded config: %s", config)
     logger.info("Step 1: Update liturgical-calendar package and cache artwork...")
     updated = update_calendar_package(config, logger=logger)
-    logger.info(f"Updater finished. Package updated: {updated}")
+    logger.info("Updater finished. Package updated: %s", updated)
 
     logger.info("Step 2: Render today's liturgical image...")
     output_path = config.get('output_path', 'today.png')
@@ -61,7 +81,7 @@ def main():
         try:
             subprocess.run(['sudo', 'shutdown', 'now'], check=True)
         except Exception as e:
-            logger.error(f"ERROR during shutdown: {e}")
+            logger.error("ERROR during shutdown: %s", e)
     else:
         logger.info("Done. Not shutting down.")
     return 0
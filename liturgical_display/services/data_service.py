@@ -6,20 +6,34 @@ Handles liturgical data access and image generation.
 """
 
 import os
-import sys
 import subprocess
 import logging
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from liturgical_calendar.liturgical import liturgical_calendar
+from ..calendar import generate_liturgical_image
 from ..utils import log
 from .reflection_service import ReflectionService
 from .scriptura_service import ScripturaService
 
 logger = logging.getLogger(__name__)
 
+def _readings_complete(readings) -> bool:
+    """True if every reading (and every alternative) was fetched and parsed."""
+    for reading in readings:
+        if not isinstance(reading, dict):
+            return False
+        for item in reading.get('alternatives') or [reading]:
+            if not item.get('parsed', False):
+                return False
+    return True
+
 class DataService:
     """Service for accessing liturgical data and generating images."""
     
@@ -38,11 +52,80 @@ class DataService:
         self.images_cache_dir = Path(self.cache_dir) / "images"
         self.images_cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # Renders are serialized, so concurrent requests for an uncached image
+        # wait for the first render instead of each starting their own
+        self._render_lock = threading.Lock()
+        
         # Initialize reflection and scriptura services with config
         self.reflection_service = ReflectionService(cache_dir=self.cache_dir, config=config)
-        self.scriptura_service = ScripturaService(config=config)
+        self.scriptura_service = ScripturaService(config=config, cache_dir=self.cache_dir)
+        
+        # liturgical-calendar helpers are created lazily and reused across requests;
+        # per-date lookups are memoized since they are constant for a given date
+        self._feast_service = None
+        self._artwork_manager = None
+        self._feast_info = functools.lru_cache(maxsize=512)(self._lookup_feast_info)
+        # date_str -> artwork lookups. Only results with a downloaded file are
+        # kept, so artwork that is missing now still shows up once downloaded.
+        self._artwork_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._next_artwork_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._artwork_cache_size = 512
+        self._artwork_cache_lock = threading.Lock()
+        
+        # date_str -> fully enriched liturgical data. Only results whose readings
+        # all parsed are kept, so a Scriptura outage isn't frozen into the cache.
+        self._liturgical_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._liturgical_cache_size = 128
+        self._liturgical_cache_lock = threading.Lock()
         
-        log(f"[data_service.py] Initialized with cache dir: {self.cache_dir}")
+        log("[data_service.py] Initialized with cache dir: %s", self.cache_dir)
+    
+    @property
+    def feast_service(self):
+        """Shared liturgical-calendar FeastService instance."""
+        if self._feast_service is None:
+            from liturgical_calendar.services.feast_service import FeastService
+            self._feast_service = FeastService()
+        return self._feast_service
+    
+    @property
+    def artwork_manager(self):
+        """Shared liturgical-calendar ArtworkManager instance."""
+        if self._artwork_manager is None:
+            from liturgical_calendar.core.artwork_manager import ArtworkManager
+            self._artwork_manager = ArtworkManager()
+        return self._artwork_manager
+    
+    def _lookup_feast_info(self, date_str: str) -> Dict[str, Any]:
+        return self.feast_service.get_combined_liturgical_info(date_str)
+    
+    def _lookup_artwork_for_date(self, date_str: str) -> Optional[dict]:
+        return self.artwork_manager.get_artwork_for_date(date_str, auto_cache=True)
+    
+    def _lookup_next_artwork(self, date_str: str) -> Optional[dict]:
+        return self.artwork_manager.find_next_artwork(date_str)
+    
+    def _cached_artwork(self, cache: "OrderedDict[str, dict]", lookup, date_str: str) -> Optional[dict]:
+        """Return lookup(date_str) from cache, caching only results with a cached_file."""
+        with self._artwork_cache_lock:
+            artwork = cache.get(date_str)
+            if artwork is not None:
+                cache.move_to_end(date_str)
+                return artwork
+        
+        artwork = lookup(date_str)
+        if artwork and artwork.get('cached_file'):
+            with self._artwork_cache_lock:
+                cache[date_str] = artwork
+                while len(cache) > self._artwork_cache_size:
+                    cache.popitem(last=False)
+        return artwork
+    
+    def _artwork_for_date(self, date_str: str) -> Optional[dict]:
+        return self._cached_artwork(self._artwork_cache, self._lookup_artwork_for_date, date_str)
+    
+    def _next_artwork(self, date_str: str) -> Optional[dict]:
+        return self._cached_artwork(self._next_artwork_cache, self._lookup_next_artwork, date_str)
     
     def get_liturgical_data(self, target_date: date) -> Dict[str, Any]:
         """
@@ -55,13 +138,21 @@ class DataService:
             Dictionary containing liturgical information
         """
         try:
-            date_str = target_date.strftime("%Y-%m-%d")
-            log(f"[data_service.py] Getting liturgical data for {date_str}")
+            date_str = target_date.isoformat()
             
-            # Use the new public API for combined feast and artwork data
-            from liturgical_calendar.services.feast_service import FeastService
-            feast_service = FeastService()
-            data = feast_service.get_combined_liturgical_info(date_str)
+            with self._liturgical_cache_lock:
+                cached = self._liturgical_cache.get(date_str)
+                if cached is not None:
+                    self._liturgical_cache.move_to_end(date_str)
+            if cached is not None:
+                # Callers may add keys, so hand out a copy
+                return dict(cached)
+            
+            log("[data_service.py] Getting liturgical data for %s", date_str)
+            
+            # Use the new public API for combined feast and artwork data.
+            # Copy the memoized result since it is enriched below.
+            data = dict(self._feast_info(date_str))
             
             # Add date information
             data['date'] = date_str
@@ -75,16 +166,22 @@ class DataService:
             if 'readings' in data:
                 data['readings'] = self.scriptura_service.get_reading_contents(data['readings'])
             
-            log(f"[data_service.py] Retrieved data: {data.get('name', 'Unknown')}")
+            log("[data_service.py] Retrieved data: %s", data.get('name', 'Unknown'))
+            if _readings_complete(data.get('readings', [])):
+                with self._liturgical_cache_lock:
+                    self._liturgical_cache[date_str] = data
+                    while len(self._liturgical_cache) > self._liturgical_cache_size:
+                        self._liturgical_cache.popitem(last=False)
+                return dict(data)
             return data
             
         except Exception as e:
-            log(f"[data_service.py] ERROR getting liturgical data: {e}")
-            logger.error(f"Error getting liturgical data for {target_date}: {e}")
+            log("[data_service.py] ERROR getting liturgical data: %s", e)
+            logger.error("Error getting liturgical data for %s: %s", target_date, e)
             # Return minimal data on error
             return {
                 "name": "Error retrieving data",
-                "date": target_date.strftime("%Y-%m-%d"),
+                "date": target_date.isoformat(),
                 "date_obj": target_date,
                 "season": "Unknown",
                 "colour": "Unknown"
@@ -102,38 +199,43 @@ class DataService:
             Path to the generated image file
         """
         try:
-            date_str = target_date.strftime("%Y-%m-%d")
-            
-            # Use liturgical-calendar's cache directory structure
-            image_filename = f"{date_str}.{format}"
-            image_path = self.images_cache_dir / image_filename
+            date_str = target_date.isoformat()
             
             # Check if image already exists in cache
-            if image_path.exists():
-                log(f"[data_service.py] Using cached image: {image_path}")
-                return str(image_path)
+            cached_path = self.get_cached_image_path(target_date, format)
+            if cached_path:
+                log("[data_service.py] Using cached image: %s", cached_path)
+                return cached_path
             
-            log(f"[data_service.py] Generating {format} image for {date_str}")
-            
-            # Generate image using liturgical-calendar CLI
-            result = subprocess.run([
-                sys.executable, '-m', 'liturgical_calendar.cli', 'generate',
-                date_str, '--output', str(image_path)
-            ], capture_output=True, text=True, check=True)
-            
-            if image_path.exists():
-                log(f"[data_service.py] Generated image: {image_path}")
-                return str(image_path)
-            else:
-                raise Exception(f"Image generation failed - file not created: {image_path}")
+            with self._render_lock:
+                # Another request may have rendered it while we waited
+                cached_path = self.get_cached_image_path(target_date, format)
+                if cached_path:
+                    return cached_path
+                
+                # Use liturgical-calendar's cache directory structure
+                image_filename = f"{date_str}.{format}"
+                image_path = self.images_cache_dir / image_filename
+                
+                log("[data_service.py] Generating %s image for %s", format, date_str)
+                
+                # Generate image in-process (falls back to the liturgical-calendar CLI)
+                generate_liturgical_image(image_path, date_str)
+                
+                if image_path.exists():
+                    log("[data_service.py] Generated image: %s", image_path)
+                    return str(image_path)
+                else:
+                    raise Exception(f"Image generation failed - file not created: {image_path}")
                 
         except subprocess.CalledProcessError as e:
-            log(f"[data_service.py] ERROR in image generation subprocess: {e}")
-            logger.error(f"Subprocess error generating image for {target_date}: {e.stderr}")
-            raise Exception(f"Image generation failed: {e.stderr}")
+            stderr = e.stderr.decode(errors='replace') if e.stderr else ''
+            log("[data_service.py] ERROR in image generation subprocess: %s", e)
+            logger.error("Subprocess error generating image for %s: %s", target_date, stderr)
+            raise Exception(f"Image generation failed: {stderr}")
         except Exception as e:
-            log(f"[data_service.py] ERROR generating image: {e}")
-            logger.error(f"Error generating image for {target_date}: {e}")
+            log("[data_service.py] ERROR generating image: %s", e)
+            logger.error("Error generating image for %s: %s", target_date, e)
             raise
     
     def get_artwork_path(self, target_date: date) -> Optional[str]:
@@ -148,25 +250,22 @@ class DataService:
         """
         try:
             # Use the liturgical-calendar ArtworkManager to get artwork info
-            from liturgical_calendar.core.artwork_manager import ArtworkManager
-            
-            date_str = target_date.strftime("%Y-%m-%d")
-            artwork_manager = ArtworkManager()
-            artwork_info = artwork_manager.get_artwork_for_date(date_str, auto_cache=True)
+            date_str = target_date.isoformat()
+            artwork_info = self._artwork_for_date(date_str)
             
             if artwork_info and artwork_info.get('cached_file'):
                 artwork_path = artwork_info['cached_file']
                 # Make sure the path is absolute
                 if not Path(artwork_path).is_absolute():
                     artwork_path = str(Path(self.cache_dir).parent / artwork_path)
-                log(f"[data_service.py] Found artwork: {artwork_path}")
+                log("[data_service.py] Found artwork: %s", artwork_path)
                 return artwork_path
             else:
-                log(f"[data_service.py] No artwork found for {target_date}")
+                log("[data_service.py] No artwork found for %s", target_date)
                 return None
                 
         except Exception as e:
-            log(f"[data_service.py] ERROR getting artwork path: {e}")
+            log("[data_service.py] ERROR getting artwork path: %s", e)
             return None
     
     def get_artwork_info(self, target_date: date) -> Optional[dict]:
@@ -181,11 +280,8 @@ class DataService:
         """
         try:
             # Use the liturgical-calendar ArtworkManager to get artwork info
-            from liturgical_calendar.core.artwork_manager import ArtworkManager
-            
-            date_str = target_date.strftime("%Y-%m-%d")
-            artwork_manager = ArtworkManager()
-            artwork_info = artwork_manager.get_artwork_for_date(date_str, auto_cache=True)
+            date_str = target_date.isoformat()
+            artwork_info = self._artwork_for_date(date_str)
             
             if artwork_info and artwork_info.get('cached_file'):
                 artwork_path = artwork_info['cached_file']
@@ -202,14 +298,14 @@ class DataService:
                     'martyr': artwork_info.get('martyr')
                 }
                 
-                log(f"[data_service.py] Found artwork info: {artwork_path}")
+                log("[data_service.py] Found artwork info: %s", artwork_path)
                 return result
             else:
-                log(f"[data_service.py] No artwork found for {target_date}")
+                log("[data_service.py] No artwork found for %s", target_date)
                 return None
                 
         except Exception as e:
-            log(f"[data_service.py] ERROR getting artwork info: {e}")
+            log("[data_service.py] ERROR getting artwork info: %s", e)
             return None
 
     def get_next_artwork_info(self, target_date: date) -> Optional[dict]:
@@ -223,12 +319,10 @@ class DataService:
             Dictionary with next artwork info, or None if not found
         """
         try:
-            from liturgical_calendar.core.artwork_manager import ArtworkManager
             from datetime import datetime
             
-            date_str = target_date.strftime("%Y-%m-%d")
-            artwork_manager = ArtworkManager()
-            next_artwork = artwork_manager.find_next_artwork(date_str)
+            date_str = target_date.isoformat()
+            next_artwork = self._next_artwork(date_str)
             
             if next_artwork and next_artwork.get('cached_file'):
                 # Make sure the path is absolute
@@ -243,20 +337,20 @@ class DataService:
                         # Parse date string like "5 August, 2025"
                         date_obj = datetime.strptime(next_artwork['date'], '%d %B, %Y').date()
                     except ValueError:
-                        log(f"[data_service.py] Could not parse date: {next_artwork['date']}")
+                        log("[data_service.py] Could not parse date: %s", next_artwork['date'])
                 
                 # Return the next artwork info with absolute path and date object
                 next_artwork_info = next_artwork.copy()
                 next_artwork_info['cached_file'] = artwork_path
                 next_artwork_info['date_obj'] = date_obj
-                log(f"[data_service.py] Found next artwork: {artwork_path}")
+                log("[data_service.py] Found next artwork: %s", artwork_path)
                 return next_artwork_info
             else:
-                log(f"[data_service.py] No next artwork found from {target_date}")
+                log("[data_service.py] No next artwork found from %s", target_date)
                 return None
                 
         except Exception as e:
-            log(f"[data_service.py] ERROR getting next artwork info: {e}")
+            log("[data_service.py] ERROR getting next artwork info: %s", e)
             return None
     
     def get_cached_image_path(self, target_date: date, format: str = 'png') -> Optional[str]:
@@ -270,12 +364,11 @@ class DataService:
         Returns:
             Path to cached image, or None if not found
         """
-        date_str = target_date.strftime("%Y-%m-%d")
-        image_filename = f"{date_str}.{format}"
-        image_path = self.images_cache_dir / image_filename
-        
-        if image_path.exists():
-            return str(image_path)
+        # One stat() per call: files may be deleted externally or by another
+        # worker's clear_cache(), so a remembered path can't be trusted
+        image_path = f"{self.images_cache_dir}{os.sep}{target_date.isoformat()}.{format}"
+        if os.path.exists(image_path):
+            return image_path
         return None
     
     def clear_cache(self, format: Optional[str] = None):
@@ -286,19 +379,18 @@ class DataService:
             format: Specific format to clear ('png', 'bmp'), or None for all
         """
         try:
-            if format:
-                pattern = f"*.{format}"
-                files = list(self.images_cache_dir.glob(pattern))
-            else:
-                files = list(self.images_cache_dir.glob("*"))
+            suffix = f".{format}" if format else ""
+            cleared = 0
+            with os.scandir(self.images_cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(suffix) and entry.is_file():
+                        os.unlink(entry.path)
+                        cleared += 1
             
-            for file in files:
-                file.unlink()
-            
-            log(f"[data_service.py] Cleared {len(files)} cached files")
+            log("[data_service.py] Cleared %s cached files", cleared)
         except Exception as e:
-            log(f"[data_service.py] ERROR clearing cache: {e}")
-            logger.error(f"Error clearing cache: {e}")
+            log("[data_service.py] ERROR clearing cache: %s", e)
+            logger.error("Error clearing cache: %s", e)
     
     def get_reflection(self, target_date: date) -> Dict[str, Any]:
         """
@@ -326,10 +418,53 @@ class DataService:
             return reflection
             
         except Exception as e:
-            log(f"[data_service.py] ERROR getting reflection: {e}")
-            logger.error(f"Error getting reflection for {target_date}: {e}")
+            log("[data_service.py] ERROR getting reflection: %s", e)
+            logger.error("Error getting reflection for %s: %s", target_date, e)
             # Return fallback reflection
             return self.reflection_service._get_fallback_reflection(target_date, {})
+
+    def get_reflection_batch(self, target_date: date) -> Dict[str, Any]:
+        """
+        Get or generate a reflection through the OpenAI Batch API (half price, slow).
+
+        Args:
+            target_date: The date to get reflection for
+
+        Returns:
+            Dictionary containing reflection data
+        """
+        try:
+            # Readings come back already enriched with their text
+            liturgical_data = self.get_liturgical_data(target_date)
+
+            return self.reflection_service.get_reflection_batch(target_date, liturgical_data)
+
+        except Exception as e:
+            log("[data_service.py] ERROR getting batch reflection: %s", e)
+            logger.error("Error getting batch reflection for %s: %s", target_date, e)
+            return self.reflection_service._get_fallback_reflection(target_date, {})
+
+    def get_reflections(self, target_dates: list) -> Dict[date, Dict[str, Any]]:
+        """
+        Get or generate reflections for several dates, generating uncached ones concurrently.
+        
+        Args:
+            target_dates: Dates to get reflections for
+            
+        Returns:
+            Dictionary mapping each date to its reflection data
+        """
+        dates = list(dict.fromkeys(target_dates))
+        if not dates:
+            return {}
+        # Each reflection is its own LLM request and cache entry, so the
+        # round-trips just overlap
+        with ThreadPoolExecutor(max_workers=min(4, len(dates))) as executor:
+            return dict(zip(dates, executor.map(self.get_reflection, dates)))
+    
+    def get_cached_reflection(self, target_date: date) -> Optional[Dict[str, Any]]:
+        """Get the reflection for a date only if it has already been generated."""
+        return self.reflection_service.get_cached_reflection(target_date)
     
     def get_token_usage(self) -> int:
         """Get total tokens used by reflection service."""
@@ -7,18 +7,76 @@ Generates daily devotional reflections using LLM integration with liturgical dat
 
 import os
 import json
+import time
 import logging
+import threading
 from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
+import httpx  # installed with openai
 import openai
 from ..utils import log
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Chat model and request settings shared by streaming and Batch API requests
+_MODEL = "gpt-4o-mini"  # Cost-effective model
+_MAX_TOKENS = 300  # Limit to keep costs low
+_TEMPERATURE = 0.7
+
+# OpenAI request timeouts: the SDK default waits up to 600s for a response,
+# while callers (the web reflection queue) need failures to surface quickly
+_REQUEST_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Batch API states after which a batch will not progress any further
+_BATCH_FINAL_STATES = frozenset(("completed", "failed", "expired", "cancelled"))
+
+# System prompt sent with every reflection request
+_SYSTEM_PROMPT = """You are a liturgical reflection generator. 
+Always produce a short devotional reflection (2–10 sentences) and a 2-line prayer.
+
+- If a feast/saint is present: name them and describe what they are remembered for, connecting to the readings. 
+- If no feast: mention the season and connect the readings to the season's themes. 
+Always end with a practical takeaway for Christian life today.
+
+The prayer should be 2 lines that resonate with the reflection, written in a traditional prayer style.
+
+Tone: warm, devotional, concise.
+
+Output format: Return a JSON object with:
+- "reflection": the devotional reflection (1-2 paragraphs)
+- "prayer": the 2-line prayer
+
+Example:
+{
+  "reflection": "Today we honor...",
+  "prayer": "Heavenly Father, grant us the courage to follow your will.\nMay we find strength in your word and peace in your presence. Amen."
+}"""
+
+def _dumps_cache(data: Dict[str, Any]) -> bytes:
+    """Serialize a cache entry as indented UTF-8 JSON (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _loads_cache(raw: bytes) -> Dict[str, Any]:
+    """Parse a cache entry written by _dumps_cache."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 class ReflectionService:
     """Service for generating liturgical reflections using LLM."""
     
+    # OpenAI clients shared by all instances, keyed by API key, so the
+    # underlying httpx connection pool (and its TLS sessions) is reused
+    _CLIENTS: Dict[str, openai.OpenAI] = {}
+    
     def __init__(self, cache_dir: Optional[str] = None, openai_api_key: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
         """Initialize the reflection service."""
         if cache_dir:
@@ -31,6 +89,11 @@ class ReflectionService:
         
         self.reflections_cache_dir = self.cache_dir / "reflections"
         self.reflections_cache_dir.mkdir(parents=True, exist_ok=True)
+        # Plain string prefix for cache file paths, cheaper than Path joins per call
+        self._refl_prefix = str(self.reflections_cache_dir) + os.sep
+        
+        # In-memory copy of reflections already read from or written to disk
+        self._mem_cache: Dict[str, Dict[str, Any]] = {}
         
         # Get API key from config, environment, or parameter
         api_key = None
@@ -44,12 +107,33 @@ class ReflectionService:
         if not api_key:
             raise ValueError("OpenAI API key not provided. Set in config file, environment variable, or parameter.")
         
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = self._get_client(api_key)
         
-        # Cost tracking
+        # Cost tracking; reflections are generated from several threads
         self.tokens_used = 0
+        self._tokens_lock = threading.Lock()
         
-        log(f"[reflection_service.py] Initialized with cache dir: {self.reflections_cache_dir}")
+        log("[reflection_service.py] Initialized with cache dir: %s", self.reflections_cache_dir)
+    
+    @classmethod
+    def _get_client(cls, api_key: str) -> openai.OpenAI:
+        """Get the shared OpenAI client for an API key, creating it on first use."""
+        client = cls._CLIENTS.get(api_key)
+        if client is None:
+            try:
+                import h2  # noqa: F401 - HTTP/2 support for httpx is optional
+                http2 = True
+            except ImportError:
+                http2 = False
+            # The SDK's httpx client subclass keeps its default timeouts and
+            # redirect settings; only HTTP/2 and the keep-alive pool change
+            http_client = openai.DefaultHttpxClient(
+                http2=http2,
+                limits=httpx.Limits(max_keepalive_connections=8),
+            )
+            client = openai.OpenAI(api_key=api_key, http_client=http_client, timeout=_REQUEST_TIMEOUT)
+            cls._CLIENTS[api_key] = client
+        return client
     
     def get_reflection(self, target_date: date, liturgical_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -63,16 +147,16 @@ class ReflectionService:
             Dictionary containing reflection data
         """
         try:
-            date_str = target_date.strftime("%Y-%m-%d")
+            date_str = target_date.isoformat()
             
             # Check cache first
             cached_reflection = self._get_cached_reflection(date_str)
             if cached_reflection:
-                log(f"[reflection_service.py] Using cached reflection for {date_str}")
+                log("[reflection_service.py] Using cached reflection for %s", date_str)
                 return cached_reflection
             
             # Generate new reflection
-            log(f"[reflection_service.py] Generating new reflection for {date_str}")
+            log("[reflection_service.py] Generating new reflection for %s", date_str)
             reflection = self._generate_reflection(target_date, liturgical_data)
             
             # Cache the reflection
@@ -81,34 +165,44 @@ class ReflectionService:
             return reflection
             
         except Exception as e:
-            log(f"[reflection_service.py] ERROR getting reflection: {e}")
-            logger.error(f"Error getting reflection for {target_date}: {e}")
+            log("[reflection_service.py] ERROR getting reflection: %s", e)
+            logger.error("Error getting reflection for %s: %s", target_date, e)
             return self._get_fallback_reflection(target_date, liturgical_data)
     
+    def get_cached_reflection(self, target_date: date) -> Optional[Dict[str, Any]]:
+        """Get a previously generated reflection, without calling the LLM."""
+        return self._get_cached_reflection(target_date.isoformat())
+    
     def _get_cached_reflection(self, date_str: str) -> Optional[Dict[str, Any]]:
         """Get cached reflection if it exists."""
-        cache_file = self.reflections_cache_dir / f"{date_str}.json"
+        if date_str in self._mem_cache:
+            return self._mem_cache[date_str]
         
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                log(f"[reflection_service.py] ERROR reading cached reflection: {e}")
-                return None
+        cache_file = self._refl_prefix + date_str + ".json"
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                reflection = _loads_cache(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log("[reflection_service.py] ERROR reading cached reflection: %s", e)
+            return None
         
-        return None
+        self._mem_cache[date_str] = reflection
+        return reflection
     
     def _cache_reflection(self, date_str: str, reflection: Dict[str, Any]) -> None:
-        """Cache a reflection to disk."""
-        cache_file = self.reflections_cache_dir / f"{date_str}.json"
+        """Cache a reflection in memory and on disk."""
+        self._mem_cache[date_str] = reflection
+        cache_file = self._refl_prefix + date_str + ".json"
         
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(reflection, f, indent=2, ensure_ascii=False)
-            log(f"[reflection_service.py] Cached reflection: {cache_file}")
+            with open(cache_file, 'wb') as f:
+                f.write(_dumps_cache(reflection))
+            log("[reflection_service.py] Cached reflection: %s", cache_file)
         except Exception as e:
-            log(f"[reflection_service.py] ERROR caching reflection: {e}")
+            log("[reflection_service.py] ERROR caching reflection: %s", e)
     
     def _generate_reflection(self, target_date: date, liturgical_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a new reflection using LLM."""
@@ -116,59 +210,146 @@ class ReflectionService:
             # Prepare inputs for LLM
             inputs = self._prepare_llm_inputs(target_date, liturgical_data)
             
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Cost-effective model
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": self._format_user_message(inputs)
-                    }
-                ],
-                max_tokens=300,  # Limit to keep costs low
-                temperature=0.7
+            # Call OpenAI API, streaming the response as it is generated
+            stream = self.client.chat.completions.create(
+                model=_MODEL,
+                messages=self._build_messages(inputs),
+                max_tokens=_MAX_TOKENS,
+                temperature=_TEMPERATURE,
+                stream=True,
+                stream_options={"include_usage": True}  # Usage arrives in the last chunk
             )
             
-            # Track token usage
-            self.tokens_used += response.usage.total_tokens
-            log(f"[reflection_service.py] Used {response.usage.total_tokens} tokens (total: {self.tokens_used})")
+            content_parts = []
+            total_tokens = 0
+            for chunk in stream:
+                if chunk.choices:
+                    content_parts.append(chunk.choices[0].delta.content or "")
+                if chunk.usage:
+                    total_tokens = chunk.usage.total_tokens
             
-            # Extract and parse JSON response
-            response_content = response.choices[0].message.content.strip()
+            return self._build_reflection(target_date, liturgical_data, "".join(content_parts), total_tokens)
             
-            try:
-                # Try to parse as JSON first
-                response_data = json.loads(response_content)
-                reflection_text = response_data.get('reflection', response_content)
-                prayer_text = response_data.get('prayer', '')
-            except json.JSONDecodeError:
-                # Fallback to treating as plain text
-                reflection_text = response_content
-                prayer_text = ''
+        except Exception as e:
+            log("[reflection_service.py] ERROR generating reflection: %s", e)
+            logger.error("Error generating reflection: %s", e)
+            raise
+    
+    def get_reflection_batch(self, target_date: date, liturgical_data: Dict[str, Any], poll_interval: float = 30) -> Dict[str, Any]:
+        """
+        Get or generate a reflection through the OpenAI Batch API.
+        
+        Batch requests are billed at half price but may take up to 24 hours;
+        this blocks, polling every poll_interval seconds, until the batch ends.
+        
+        Args:
+            target_date: The date to get reflection for
+            liturgical_data: Liturgical data including season, readings, feast info
+            poll_interval: Seconds between batch status checks
             
-            # Text will be rendered as-is in the template
+        Returns:
+            Dictionary containing reflection data
+        """
+        try:
+            date_str = target_date.isoformat()
             
-            # Build response
-            reflection = {
-                "date": target_date.strftime("%Y-%m-%d"),
-                "season": liturgical_data.get('season', 'Unknown'),
-                "title": liturgical_data.get('name', ''),
-                "reflection": reflection_text,
-                "prayer": prayer_text,
-                "generated_at": datetime.now().isoformat(),
-                "tokens_used": response.usage.total_tokens
+            cached_reflection = self._get_cached_reflection(date_str)
+            if cached_reflection:
+                log("[reflection_service.py] Using cached reflection for %s", date_str)
+                return cached_reflection
+            
+            inputs = self._prepare_llm_inputs(target_date, liturgical_data)
+            request_line = {
+                "custom_id": date_str,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": _MODEL,
+                    "messages": self._build_messages(inputs),
+                    "max_tokens": _MAX_TOKENS,
+                    "temperature": _TEMPERATURE
+                }
             }
+            batch_input = self.client.files.create(
+                file=(f"reflection-{date_str}.jsonl", json.dumps(request_line).encode('utf-8')),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_input.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            log("[reflection_service.py] Submitted batch %s for %s", batch.id, date_str)
             
+            while batch.status not in _BATCH_FINAL_STATES:
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+            
+            output_line = json.loads(self.client.files.content(batch.output_file_id).text.splitlines()[0])
+            body = output_line["response"]["body"]
+            reflection = self._build_reflection(
+                target_date, liturgical_data,
+                body["choices"][0]["message"]["content"] or "",
+                body.get("usage", {}).get("total_tokens", 0)
+            )
+            
+            self._cache_reflection(date_str, reflection)
             return reflection
             
         except Exception as e:
-            log(f"[reflection_service.py] ERROR generating reflection: {e}")
-            logger.error(f"Error generating reflection: {e}")
-            raise
+            log("[reflection_service.py] ERROR getting batch reflection: %s", e)
+            logger.error("Error getting batch reflection for %s: %s", target_date, e)
+            return self._get_fallback_reflection(target_date, liturgical_data)
+    
+    def _build_messages(self, inputs: Dict[str, Any]) -> list:
+        """Build the chat messages for a reflection request."""
+        return [
+            {
+                "role": "system",
+                "content": self._get_system_prompt()
+            },
+            {
+                "role": "user",
+                "content": self._format_user_message(inputs)
+            }
+        ]
+    
+    def _build_reflection(self, target_date: date, liturgical_data: Dict[str, Any], response_content: str, total_tokens: int) -> Dict[str, Any]:
+        """Turn the model's reply into a reflection dict and record its token usage."""
+        # Track token usage
+        with self._tokens_lock:
+            self.tokens_used += total_tokens
+            tokens_used = self.tokens_used
+        log("[reflection_service.py] Used %s tokens (total: %s)", total_tokens, tokens_used)
+        
+        # Extract and parse JSON response
+        response_content = response_content.strip()
+        
+        try:
+            # Try to parse as JSON first
+            response_data = json.loads(response_content)
+            reflection_text = response_data.get('reflection', response_content)
+            prayer_text = response_data.get('prayer', '')
+        except json.JSONDecodeError:
+            # Fallback to treating as plain text
+            reflection_text = response_content
+            prayer_text = ''
+        
+        # Text will be rendered as-is in the template
+        
+        # Build response
+        return {
+            "date": target_date.isoformat(),
+            "season": liturgical_data.get('season', 'Unknown'),
+            "title": liturgical_data.get('name', ''),
+            "reflection": reflection_text,
+            "prayer": prayer_text,
+            "generated_at": datetime.now().isoformat(),
+            "tokens_used": total_tokens
+        }
     
     def _prepare_llm_inputs(self, target_date: date, liturgical_data: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare inputs for LLM from liturgical data."""
@@ -184,33 +365,12 @@ class ReflectionService:
     
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the LLM."""
-        return """You are a liturgical reflection generator. 
-Always produce a short devotional reflection (2–10 sentences) and a 2-line prayer.
-
-- If a feast/saint is present: name them and describe what they are remembered for, connecting to the readings. 
-- If no feast: mention the season and connect the readings to the season's themes. 
-Always end with a practical takeaway for Christian life today.
-
-The prayer should be 2 lines that resonate with the reflection, written in a traditional prayer style.
-
-Tone: warm, devotional, concise.
-
-Output format: Return a JSON object with:
-- "reflection": the devotional reflection (1-2 paragraphs)
-- "prayer": the 2-line prayer
-
-Example:
-{
-  "reflection": "Today we honor...",
-  "prayer": "Heavenly Father, grant us the courage to follow your will.\nMay we find strength in your word and peace in your presence. Amen."
-}"""
+        return _SYSTEM_PROMPT
     
     def _format_user_message(self, inputs: Dict[str, Any]) -> str:
         """Format the user message for the LLM."""
-        message_parts = []
-        
         # Season
-        message_parts.append(f"Season: {inputs['season']}")
+        message_parts = [f"Season: {inputs['season']}"]
         
         # Feast info
         if inputs['feast']:
@@ -244,7 +404,7 @@ Example:
         # Text will be rendered as-is in the template
         
         return {
-            "date": target_date.strftime("%Y-%m-%d"),
+            "date": target_date.isoformat(),
             "season": liturgical_data.get('season', 'Unknown'),
             "title": feast,
             "reflection": reflection_text,
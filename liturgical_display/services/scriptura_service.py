@@ -7,17 +7,35 @@ Uses the enhanced local Scriptura API with built-in parsing capabilities.
 """
 
 import os
+import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-from typing import Dict, Any, Optional
-from ..utils import log
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import quote
+from ..utils import log, write_json_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeouts for Scriptura API requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Upper bound on remembered unparseable references
+NEGATIVE_CACHE_SIZE = 256
+
 class ScripturaService:
     """Service for fetching reading contents from Scriptura API."""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://www.scriptura-api.com", config: Optional[Dict[str, Any]] = None, version: str = "asv"):
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://www.scriptura-api.com", config: Optional[Dict[str, Any]] = None, version: str = "asv", cache_dir: Optional[str] = None):
         """Initialize the Scriptura service."""
         # Scriptura API is free and doesn't require an API key
         self.api_key = None  # Not needed for this API
@@ -27,7 +45,7 @@ class ScripturaService:
             scriptura_config = config.get('scriptura', {})
             local_port = scriptura_config.get('local_port', 8081)
             self.base_url = f"http://localhost:{local_port}"
-            log(f"[scriptura_service.py] Using LOCAL Scriptura API at: {self.base_url}")
+            log("[scriptura_service.py] Using LOCAL Scriptura API at: %s", self.base_url)
         else:
             # No remote fallback - fail clearly if local is not configured
             raise ValueError("Scriptura API not configured for local use. Set scriptura.use_local: true in config.yml")
@@ -39,6 +57,58 @@ class ScripturaService:
             self.version = version
         
         self.config = config or {}
+        self._parse_url = f"{self.base_url}/api/parse/reference/"
+        
+        # One keep-alive session for all API calls instead of a new
+        # connection per reading
+        self.session = requests.Session()
+        # Retry only quick failures (refused connections, gateway errors);
+        # a read timeout already waited REQUEST_TIMEOUT and isn't repeated
+        retry = Retry(total=2, connect=2, read=0, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'LiturgicalDisplay/1.0 (https://github.com/ludwigw/liturgical_display)'
+        })
+        
+        # (reference, version) -> successful parse result
+        self._reference_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        # (reference, version) -> parsed=False result, so references the API
+        # can't parse aren't re-sent all day. Transport errors aren't cached.
+        self._negative_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        
+        # (reference, version) -> pending API call, so concurrent lookups of
+        # the same reference share one request
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._in_flight_lock = threading.Lock()
+        
+        # Successful parses are also persisted, so a restarted process doesn't
+        # have to fetch the same passages again
+        self.scriptura_cache_dir = None
+        if cache_dir:
+            self.scriptura_cache_dir = Path(cache_dir) / "scriptura" / self.version
+            self.scriptura_cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Worker threads for concurrent reading lookups, started on first use
+        # and kept for the life of the service
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def close(self):
+        """Close the underlying HTTP session and worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def get_reading_contents(self, readings: list) -> list:
         """
@@ -51,19 +121,41 @@ class ScripturaService:
             List of dictionaries with reading references and their text contents
         """
         try:
+            # Collect every reference to fetch, including each side of an
+            # "A or B" alternative, so they can be fetched concurrently
+            # Each reading is split once; a single-element list means no alternatives
+            split_readings = [reading_ref.split(' or ') if isinstance(reading_ref, str) else None
+                              for reading_ref in readings]
+            references = []
+            for reading_ref, alternatives in zip(readings, split_readings):
+                if alternatives is None:
+                    continue
+                if len(alternatives) > 1:
+                    references.extend(alt.strip() for alt in alternatives)
+                else:
+                    references.append(reading_ref)
+            
+            # Fetch each distinct reference only once
+            references = list(dict.fromkeys(references))
+            
+            texts = {}
+            if references:
+                # Each lookup is an independent, latency-bound API call
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="scriptura")
+                texts = dict(zip(references, self._executor.map(self._get_reading_text_with_status, references)))
+            
             enriched_readings = []
             
-            for reading_ref in readings:
-                if isinstance(reading_ref, str):
+            for reading_ref, alternatives in zip(readings, split_readings):
+                if alternatives is not None:
                     # Check if this reading contains "or" (alternative readings)
-                    if ' or ' in reading_ref:
-                        # Split by "or" and handle each alternative separately
-                        alternatives = [alt.strip() for alt in reading_ref.split(' or ')]
-                        
+                    if len(alternatives) > 1:
                         # Create a special structure for alternative readings
                         alternative_readings = []
                         for alt_ref in alternatives:
-                            text, parsed = self._get_reading_text_with_status(alt_ref)
+                            alt_ref = alt_ref.strip()
+                            text, parsed = texts[alt_ref]
                             alternative_readings.append({
                                 'reference': alt_ref,
                                 'text': text,
@@ -79,7 +171,7 @@ class ScripturaService:
                         })
                     else:
                         # Regular single reading
-                        text, parsed = self._get_reading_text_with_status(reading_ref)
+                        text, parsed = texts[reading_ref]
                         enriched_readings.append({
                             'reference': reading_ref,
                             'text': text,
@@ -92,8 +184,8 @@ class ScripturaService:
             return enriched_readings
             
         except Exception as e:
-            log(f"[scriptura_service.py] ERROR getting reading contents: {e}")
-            logger.error(f"Error getting reading contents: {e}")
+            log("[scriptura_service.py] ERROR getting reading contents: %s", e)
+            logger.error("Error getting reading contents: %s", e)
             return readings  # Return original on error
     
     def _get_reading_text_with_status(self, reference: str) -> tuple[str, bool]:
@@ -116,42 +208,14 @@ class ScripturaService:
             else:
                 # Fallback for parsing errors
                 error_msg = parse_result.get('error', 'Unknown parsing error') if parse_result else 'No response from API'
-                log(f"[scriptura_service.py] Parsing failed for '{reference}': {error_msg}")
+                log("[scriptura_service.py] Parsing failed for '%s': %s", reference, error_msg)
                 return f"[Reading: {reference}]", False
                 
         except Exception as e:
-            log(f"[scriptura_service.py] ERROR getting reading text for '{reference}': {e}")
-            logger.error(f"Error getting reading text for '{reference}': {e}")
+            log("[scriptura_service.py] ERROR getting reading text for '%s': %s", reference, e)
+            logger.error("Error getting reading text for '%s': %s", reference, e)
             return f"[Reading: {reference}]", False
 
-    def _get_reading_text(self, reference: str) -> str:
-        """
-        Get the text content for a specific reading reference using enhanced parsing.
-        
-        Args:
-            reference: Bible reference (e.g., "John 3:16", "Psalm 23:1-6", "Psalm 104:26-36,37")
-            
-        Returns:
-            Text content of the reading with proper paragraph structure
-        """
-        try:
-            # Use the enhanced parsing API to handle complex references
-            parse_result = self._parse_reference_with_api(reference)
-            
-            if parse_result and parse_result.get('parsed', False):
-                # Use the formatted text from the parsing API
-                return parse_result.get('formatted_text', f"[Reading: {reference}]")
-            else:
-                # Fallback for parsing errors
-                error_msg = parse_result.get('error', 'Unknown parsing error') if parse_result else 'No response from API'
-                log(f"[scriptura_service.py] Parsing failed for '{reference}': {error_msg}")
-                return f"[Reading: {reference}]"
-                
-        except Exception as e:
-            log(f"[scriptura_service.py] ERROR getting reading text for '{reference}': {e}")
-            logger.error(f"Error getting reading text for '{reference}': {e}")
-            return f"[Reading: {reference}]"
-    
     def _parse_reference_with_api(self, reference: str) -> Optional[Dict[str, Any]]:
         """
         Parse a Bible reference using the enhanced local Scriptura API.
@@ -162,18 +226,109 @@ class ScripturaService:
         Returns:
             Parsing result dictionary or None on error
         """
+        # Scripture text never changes, so successful parses are kept for the
+        # lifetime of the service
+        cache_key = (reference, self.version)
+        cached = self._reference_cache.get(cache_key)
+        if cached is None:
+            cached = self._negative_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        cached = self._load_cached_parse(reference)
+        if cached is not None:
+            self._reference_cache[cache_key] = cached
+            return cached
+        
+        with self._in_flight_lock:
+            future = self._in_flight.get(cache_key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[cache_key] = future
+        if not is_owner:
+            return future.result()
+        
+        result = None
+        try:
+            result = self._fetch_parse(reference, cache_key)
+            return result
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[cache_key]
+            future.set_result(result)
+    
+    def _fetch_parse(self, reference: str, cache_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Call the Scriptura parse endpoint and cache the result."""
         try:
             # Use the enhanced parsing endpoint
-            url = f"{self.base_url}/api/parse/reference/{reference}"
+            url = self._parse_url + quote(reference, safe=':,-')
             params = {'version': self.version}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             
-            return response.json()
+            result = orjson.loads(response.content) if orjson is not None else response.json()
+            if result and result.get('parsed', False):
+                self._reference_cache[cache_key] = result
+                self._save_cached_parse(reference, result)
+            elif result:
+                if len(self._negative_cache) >= NEGATIVE_CACHE_SIZE:
+                    # Drop the oldest entry
+                    self._negative_cache.pop(next(iter(self._negative_cache)))
+                self._negative_cache[cache_key] = result
+            return result
             
         except Exception as e:
-            log(f"[scriptura_service.py] ERROR parsing reference '{reference}': {e}")
-            logger.error(f"Error parsing reference '{reference}': {e}")
+            log("[scriptura_service.py] ERROR parsing reference '%s': %s", reference, e)
+            logger.error("Error parsing reference '%s': %s", reference, e)
             return None
+    
+    def clear_cache(self):
+        """Clear cached reference parses, in memory and on disk."""
+        self._reference_cache.clear()
+        self._negative_cache.clear()
+        if self.scriptura_cache_dir is None:
+            return
+        try:
+            files = list(self.scriptura_cache_dir.glob("*.json"))
+            for file in files:
+                file.unlink()
+            log("[scriptura_service.py] Cleared %s cached references", len(files))
+        except Exception as e:
+            log("[scriptura_service.py] ERROR clearing cache: %s", e)
+            logger.error("Error clearing Scriptura cache: %s", e)
+    
+    def _get_parse_cache_path(self, reference: str) -> Optional[Path]:
+        """Get the on-disk cache file for a reference, or None if disk caching is off."""
+        if self.scriptura_cache_dir is None:
+            return None
+        # Percent-encoding keeps the name filesystem-safe and unique per reference
+        return self.scriptura_cache_dir / f"{quote(reference, safe='')}.json"
+    
+    def _load_cached_parse(self, reference: str) -> Optional[Dict[str, Any]]:
+        """Load a previously saved parse result from disk."""
+        cache_path = self._get_parse_cache_path(reference)
+        if cache_path is None:
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log("[scriptura_service.py] ERROR loading cached reference '%s': %s", reference, e)
+            return None
+    
+    def _save_cached_parse(self, reference: str, result: Dict[str, Any]) -> None:
+        """Save a successful parse result to disk."""
+        cache_path = self._get_parse_cache_path(reference)
+        if cache_path is None:
+            return
+        try:
+            # Atomic, so a crash or another worker never leaves a truncated file
+            write_json_atomic(cache_path, result)
+        except Exception as e:
+            log("[scriptura_service.py] ERROR caching reference '%s': %s", reference, e)
     
\ No newline at end of file
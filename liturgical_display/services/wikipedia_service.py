@@ -6,18 +6,33 @@ Handles fetching and caching Wikipedia summaries.
 """
 
 import os
+import re
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any, Optional
-from urllib.parse import urlparse
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import quote, unquote, urlparse
 
-from ..utils import log
+from ..utils import log, write_json_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Anything other than letters, digits, '_', ' ' and '-' is dropped from cache filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w \-]')
+
 class WikipediaService:
     """Service for fetching and caching Wikipedia summaries."""
     
@@ -27,6 +42,15 @@ class WikipediaService:
         self.wikipedia_cache_dir = Path(self.cache_dir) / "wikipedia"
         self.wikipedia_cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_duration = timedelta(hours=cache_duration_hours)
+        self._cache_duration_s = cache_duration_hours * 3600.0
+        # Cache paths are built by string concatenation from this prefix
+        self._cache_path_prefix = str(self.wikipedia_cache_dir) + os.sep
+        
+        # In-memory LRU in front of the disk cache:
+        # article title -> (time the summary was fetched, summary data)
+        self._mem_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._mem_cache_size = 256
+        self._mem_cache_lock = threading.Lock()
         
         # Wikipedia API base URL
         self.api_base_url = "https://en.wikipedia.org/api/rest_v1/page/summary"
@@ -36,7 +60,19 @@ class WikipediaService:
             'User-Agent': 'LiturgicalDisplay/1.0 (https://github.com/ludwigw/liturgical_display)'
         }
         
-        log(f"[wikipedia_service.py] Initialized with cache dir: {self.cache_dir}")
+        # Keep-alive session so repeat lookups skip the TLS handshake
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.2,
+                      status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(self.headers)
+        
+        log("[wikipedia_service.py] Initialized with cache dir: %s", self.cache_dir)
+    
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
     
     def extract_article_title(self, wikipedia_url: str) -> Optional[str]:
         """
@@ -53,18 +89,15 @@ class WikipediaService:
             if 'wikipedia.org' not in parsed.netloc:
                 return None
             
-            # Extract title from path
-            path_parts = parsed.path.strip('/').split('/')
-            if len(path_parts) >= 2 and path_parts[0] == 'wiki':
-                title = path_parts[1]
+            # Extract title from path ("/wiki/<title>")
+            prefix, _, title = parsed.path.strip('/').partition('/')
+            if prefix == 'wiki' and title:
                 # URL decode the title
-                import urllib.parse
-                title = urllib.parse.unquote(title)
-                return title
+                return unquote(title)
             
             return None
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR extracting title from URL: {e}")
+            log("[wikipedia_service.py] ERROR extracting title from URL: %s", e)
             return None
     
     def get_cache_path(self, article_title: str) -> Path:
@@ -78,9 +111,9 @@ class WikipediaService:
             Path to cache file
         """
         # Sanitize filename
-        safe_title = "".join(c for c in article_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = _UNSAFE_FILENAME_CHARS.sub('', article_title).rstrip()
         safe_title = safe_title.replace(' ', '_')
-        return self.wikipedia_cache_dir / f"{safe_title}.json"
+        return Path(self._cache_path_prefix + safe_title + '.json')
     
     def is_cache_valid(self, cache_path: Path) -> bool:
         """
@@ -92,16 +125,14 @@ class WikipediaService:
         Returns:
             True if cache is valid, False otherwise
         """
-        if not cache_path.exists():
-            return False
-        
         try:
             # Check file modification time
-            mtime = datetime.fromtimestamp(cache_path.stat().st_mtime)
-            age = datetime.now() - mtime
-            return age < self.cache_duration
+            age = time.time() - cache_path.stat().st_mtime
+            return age < self._cache_duration_s
+        except FileNotFoundError:
+            return False
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR checking cache validity: {e}")
+            log("[wikipedia_service.py] ERROR checking cache validity: %s", e)
             return False
     
     def load_from_cache(self, cache_path: Path) -> Optional[Dict[str, Any]]:
@@ -115,14 +146,36 @@ class WikipediaService:
             Cached data, or None if loading failed
         """
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            log(f"[wikipedia_service.py] Loaded from cache: {cache_path}")
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            log("[wikipedia_service.py] Loaded from cache: %s", cache_path)
             return data
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR loading from cache: {e}")
+            log("[wikipedia_service.py] ERROR loading from cache: %s", e)
             return None
     
+    def _load_if_fresh(self, cache_path: Path) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Load cached data if the file exists and is still valid, with one stat().
+        
+        Returns:
+            Tuple of (cached data, file mtime), or None on miss/expiry/error
+        """
+        try:
+            mtime = cache_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log("[wikipedia_service.py] ERROR checking cache validity: %s", e)
+            return None
+        if time.time() - mtime >= self._cache_duration_s:
+            return None
+        data = self.load_from_cache(cache_path)
+        if not data:
+            return None
+        return data, mtime
+    
     def save_to_cache(self, cache_path: Path, data: Dict[str, Any]):
         """
         Save data to cache file.
@@ -132,30 +185,43 @@ class WikipediaService:
             data: Data to cache
         """
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            log(f"[wikipedia_service.py] Saved to cache: {cache_path}")
+            # Temp file + rename, so readers never see a partially written cache file
+            write_json_atomic(cache_path, data)
+            log("[wikipedia_service.py] Saved to cache: %s", cache_path)
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR saving to cache: {e}")
+            log("[wikipedia_service.py] ERROR saving to cache: %s", e)
     
-    def fetch_from_wikipedia(self, article_title: str) -> Optional[Dict[str, Any]]:
+    def fetch_from_wikipedia(self, article_title: str, cached_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Fetch summary from Wikipedia API.
         
         Args:
             article_title: Wikipedia article title
+            cached_data: Expired cached summary to revalidate, if any
             
         Returns:
-            Wikipedia summary data, or None if fetch failed
+            Wikipedia summary data (cached_data itself if the article is
+            unchanged), or None if fetch failed
         """
         try:
-            url = f"{self.api_base_url}/{article_title}"
-            log(f"[wikipedia_service.py] Fetching from Wikipedia API: {url}")
+            url = f"{self.api_base_url}/{quote(article_title, safe='')}"
+            log("[wikipedia_service.py] Fetching from Wikipedia API: %s", url)
             
-            response = requests.get(url, headers=self.headers, timeout=10)
+            # Conditional request, so an unchanged article costs a 304 with no body
+            headers = {}
+            if cached_data:
+                if cached_data.get('etag'):
+                    headers['If-None-Match'] = cached_data['etag']
+                if cached_data.get('last_modified'):
+                    headers['If-Modified-Since'] = cached_data['last_modified']
+            
+            response = self.session.get(url, headers=headers, timeout=10)
+            if response.status_code == 304 and cached_data:
+                log("[wikipedia_service.py] Summary not modified: %s", article_title)
+                return cached_data
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content) if orjson is not None else response.json()
             
             # Extract relevant information
             summary_data = {
@@ -163,19 +229,21 @@ class WikipediaService:
                 'extract': data.get('extract', ''),
                 'content_url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
                 'thumbnail': data.get('thumbnail', {}).get('source', '') if data.get('thumbnail') else '',
-                'timestamp': datetime.now().isoformat()
+                'timestamp': datetime.now().isoformat(),
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', '')
             }
             
-            log(f"[wikipedia_service.py] Successfully fetched summary for: {summary_data['title']}")
+            log("[wikipedia_service.py] Successfully fetched summary for: %s", summary_data['title'])
             return summary_data
             
         except requests.exceptions.RequestException as e:
-            log(f"[wikipedia_service.py] ERROR fetching from Wikipedia API: {e}")
-            logger.error(f"Wikipedia API request failed for {article_title}: {e}")
+            log("[wikipedia_service.py] ERROR fetching from Wikipedia API: %s", e)
+            logger.error("Wikipedia API request failed for %s: %s", article_title, e)
             return None
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR processing Wikipedia response: {e}")
-            logger.error(f"Error processing Wikipedia response for {article_title}: {e}")
+            log("[wikipedia_service.py] ERROR processing Wikipedia response: %s", e)
+            logger.error("Error processing Wikipedia response for %s: %s", article_title, e)
             return None
     
     def get_summary(self, wikipedia_url: str) -> Optional[Dict[str, Any]]:
@@ -192,40 +260,95 @@ class WikipediaService:
             # Extract article title from URL
             article_title = self.extract_article_title(wikipedia_url)
             if not article_title:
-                log(f"[wikipedia_service.py] Could not extract title from URL: {wikipedia_url}")
+                log("[wikipedia_service.py] Could not extract title from URL: %s", wikipedia_url)
                 return None
             
-            # Check cache first
+            # Check memory, then disk
+            cached_data = self._get_from_memory(article_title)
+            if cached_data:
+                return cached_data
+            
             cache_path = self.get_cache_path(article_title)
-            if self.is_cache_valid(cache_path):
-                cached_data = self.load_from_cache(cache_path)
-                if cached_data:
-                    return cached_data
+            fresh = self._load_if_fresh(cache_path)
+            if fresh:
+                cached_data, mtime = fresh
+                self._put_in_memory(article_title, cached_data, mtime)
+                return cached_data
             
-            # Fetch from Wikipedia API
-            summary_data = self.fetch_from_wikipedia(article_title)
+            # Fetch from Wikipedia API, revalidating an expired copy if there is one
+            stale_data = self.load_from_cache(cache_path) if cache_path.exists() else None
+            summary_data = self.fetch_from_wikipedia(article_title, stale_data)
             if summary_data:
-                # Save to cache
-                self.save_to_cache(cache_path, summary_data)
+                if summary_data is stale_data:
+                    # Unchanged upstream; just mark the cached copy fresh again
+                    try:
+                        os.utime(cache_path, None)
+                    except OSError as e:
+                        log("[wikipedia_service.py] ERROR refreshing cache mtime: %s", e)
+                else:
+                    # Save to cache
+                    self.save_to_cache(cache_path, summary_data)
+                self._put_in_memory(article_title, summary_data, time.time())
                 return summary_data
             
             return None
             
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR getting summary: {e}")
-            logger.error(f"Error getting Wikipedia summary for {wikipedia_url}: {e}")
+            log("[wikipedia_service.py] ERROR getting summary: %s", e)
+            logger.error("Error getting Wikipedia summary for %s: %s", wikipedia_url, e)
             return None
     
+    def get_summaries(self, wikipedia_urls: list) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get Wikipedia summaries for several URLs, fetching uncached ones concurrently.
+        
+        Args:
+            wikipedia_urls: List of full Wikipedia URLs
+            
+        Returns:
+            Dictionary mapping each URL to its summary data (or None)
+        """
+        urls = list(dict.fromkeys(wikipedia_urls))
+        if not urls:
+            return {}
+        # get_summary never raises and each article has its own cache file,
+        # so the lookups are independent
+        with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.get_summary, urls)))
+    
+    def _get_from_memory(self, article_title: str) -> Optional[Dict[str, Any]]:
+        """Get a still-valid summary from the in-memory cache."""
+        with self._mem_cache_lock:
+            entry = self._mem_cache.get(article_title)
+            if entry is None:
+                return None
+            fetched_at, data = entry
+            if time.time() - fetched_at >= self._cache_duration_s:
+                del self._mem_cache[article_title]
+                return None
+            self._mem_cache.move_to_end(article_title)
+            return data
+    
+    def _put_in_memory(self, article_title: str, data: Dict[str, Any], fetched_at: float):
+        """Store a summary in the in-memory cache, evicting the least recently used."""
+        with self._mem_cache_lock:
+            self._mem_cache[article_title] = (fetched_at, data)
+            self._mem_cache.move_to_end(article_title)
+            while len(self._mem_cache) > self._mem_cache_size:
+                self._mem_cache.popitem(last=False)
+    
     def clear_cache(self):
         """Clear the Wikipedia cache."""
+        with self._mem_cache_lock:
+            self._mem_cache.clear()
         try:
             files = list(self.wikipedia_cache_dir.glob("*.json"))
             for file in files:
                 file.unlink()
-            log(f"[wikipedia_service.py] Cleared {len(files)} cached Wikipedia summaries")
+            log("[wikipedia_service.py] Cleared %s cached Wikipedia summaries", len(files))
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR clearing cache: {e}")
-            logger.error(f"Error clearing Wikipedia cache: {e}")
+            log("[wikipedia_service.py] ERROR clearing cache: %s", e)
+            logger.error("Error clearing Wikipedia cache: %s", e)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -244,5 +367,5 @@ class WikipediaService:
                 'cache_dir': str(self.wikipedia_cache_dir)
             }
         except Exception as e:
-            log(f"[wikipedia_service.py] ERROR getting cache stats: {e}")
+            log("[wikipedia_service.py] ERROR getting cache stats: %s", e)
             return {'error': str(e)} 
\ No newline at end of file
@@ -1,15 +1,56 @@
 #!/usr/bin/env python3
-import yaml
 import os
 import sys
+import importlib
 import subprocess
-from git import Repo, InvalidGitRepositoryError
-from .utils import log
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+from git import Git, Repo, InvalidGitRepositoryError
+from .utils import log, load_config
 
-def load_config():
-    config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yaml')
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+PACKAGE_NAME = 'liturgical-calendar'
+PACKAGE_REPO_URL = 'https://github.com/ludwigw/liturgical-calendar.git'
+
+# Default cache directory, used when the config doesn't set cache_dir
+_DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache"
+
+# File (in the cache directory) holding the remote HEAD commit the package
+# was last installed from
+_INSTALLED_SHA_FILENAME = "liturgical_calendar_head"
+
+def _installed_sha_file(config):
+    """Path of the installed-commit file inside the configured cache_dir."""
+    cache_dir = (config or {}).get('cache_dir')
+    return (Path(cache_dir) if cache_dir else _DEFAULT_CACHE_DIR) / _INSTALLED_SHA_FILENAME
+
+def get_installed_version():
+    """Return the installed liturgical-calendar version, or None if it isn't installed."""
+    try:
+        return version(PACKAGE_NAME)
+    except PackageNotFoundError:
+        return None
+
+def get_remote_head_sha():
+    """Return the package repo's remote HEAD commit, or None if it can't be reached."""
+    try:
+        output = Git().ls_remote(PACKAGE_REPO_URL, 'HEAD')
+        return output.split()[0] if output else None
+    except Exception as e:
+        log("[updater.py] Could not query remote HEAD: %s", e)
+        return None
+
+def _read_installed_sha(sha_file):
+    try:
+        return sha_file.read_text().strip() or None
+    except OSError:
+        return None
+
+def _write_installed_sha(sha_file, sha):
+    try:
+        sha_file.parent.mkdir(parents=True, exist_ok=True)
+        sha_file.write_text(sha + "\n")
+    except OSError as e:
+        log("[updater.py] Could not record installed commit: %s", e)
 
 def update_calendar_package(config=None, logger=None):
     """Update the liturgical-calendar package and run cache-artwork if needed."""
@@ -28,22 +69,26 @@ def update_calendar_package(config=None, logger=None):
     log("[updater.py] Checking for liturgical-calendar package updates...")
     try:
         # Get current version
-        result = subprocess.run([
-            sys.executable, '-m', 'pip', 'show', 'liturgical-calendar'
-        ], capture_output=True, text=True, check=True)
-        current_version = result.stdout
+        current_version = get_installed_version()
+        
+        # Skip pip entirely if the repo hasn't moved since the last install
+        sha_file = _installed_sha_file(config)
+        remote_sha = get_remote_head_sha()
+        if current_version is not None and remote_sha is not None and remote_sha == _read_installed_sha(sha_file):
+            log("[updater.py] Package already up to date (%s).", remote_sha[:12])
+            return False
         
         # Install/upgrade to latest
         subprocess.run([
             sys.executable, '-m', 'pip', 'install', '--upgrade',
-            'git+https://github.com/ludwigw/liturgical-calendar.git'
+            f'git+{PACKAGE_REPO_URL}'
         ], check=True)
+        if remote_sha is not None:
+            _write_installed_sha(sha_file, remote_sha)
         
-        # Check if version changed
-        result = subprocess.run([
-            sys.executable, '-m', 'pip', 'show', 'liturgical-calendar'
-        ], capture_output=True, text=True, check=True)
-        new_version = result.stdout
+        # Check if version changed (pip wrote new metadata, so drop stale finder caches)
+        importlib.invalidate_caches()
+        new_version = get_installed_version()
         
         updated = (current_version != new_version)
         if updated:
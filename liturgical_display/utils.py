@@ -1,5 +1,72 @@
+import functools
+import json
 import logging
+import os
+import sys
+import tempfile
 
-def log(message):
-    """Simple logging function that prints to stdout"""
-    print(message) 
\ No newline at end of file
+import yaml
+
+try:
+    # libyaml-backed loader (much faster); needs libyaml-dev when PyYAML is built
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Console logger behind log(). Deliberately outside the "liturgical_display"
+# hierarchy so main.setup_logging() neither resets it nor copies its messages
+# to the display log file.
+_console = logging.getLogger("liturgical_console")
+_console.propagate = False
+if not _console.handlers:
+    _console_handler = logging.StreamHandler(sys.stdout)
+    _console_handler.setFormatter(logging.Formatter('%(message)s'))
+    _console.addHandler(_console_handler)
+    _console.setLevel(logging.INFO)
+
+def log(message, *args):
+    """Simple logging function that prints to stdout.
+
+    %-style args are only formatted if the message is actually emitted.
+    """
+    _console.info(message, *args)
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path, mtime_ns):
+    with open(config_path) as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+def load_config(config_path=None):
+    """Load the YAML config, re-parsing only when the file changes on disk.
+
+    The returned dict is shared between callers, so treat it as read-only.
+    """
+    if config_path is None:
+        config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yml')
+    return _load_config_cached(config_path, os.stat(config_path).st_mtime_ns)
+
+def write_json_atomic(path, data):
+    """Write data as compact UTF-8 JSON (orjson when installed) to path, atomically.
+
+    The JSON goes to a temp file in the same directory that is then renamed
+    into place, so readers never see a partially written file. Errors are
+    raised after the temp file is removed.
+    """
+    if orjson is not None:
+        raw = orjson.dumps(data)
+    else:
+        raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
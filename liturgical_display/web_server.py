@@ -6,48 +6,261 @@ Provides HTTP endpoints for accessing liturgical information and images.
 """
 
 import os
+import re
+import sys
+import glob
+import threading
+import importlib.util
+import html
+import gzip
+import functools
 import logging
-import yaml
-from datetime import datetime, date
-from flask import Flask, jsonify, render_template, send_file, abort
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time, timedelta
+from flask import Flask, jsonify, render_template, send_file, abort, request
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from pathlib import Path
 
 from .services.data_service import DataService
 from .services.wikipedia_service import WikipediaService
-from .utils import log
+from .utils import log, load_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static')
 
-# Initialize services (will be reinitialized with config in create_app)
+# Services are created by create_app, i.e. inside each gunicorn worker, so
+# every process gets its own HTTP sessions and connection pools
 data_service = None
-wikipedia_service = WikipediaService()
+wikipedia_service = None
+
+# Dates whose reflection is queued or being generated in the background; at
+# most MAX_PENDING_REFLECTIONS at a time
+_pending_reflections = set()
+_pending_reflections_lock = threading.Lock()
+MAX_PENDING_REFLECTIONS = 8
+
+# Fallback reflections from failed generations, by date, with the time they
+# were recorded: served (200) until they expire so clients stop polling and
+# failures (no API key, OpenAI errors) aren't retried on every poll
+_failed_reflections: "OrderedDict[date, tuple]" = OrderedDict()
+FAILED_REFLECTION_RETRY = timedelta(minutes=10)
+FAILED_REFLECTION_CACHE_SIZE = 64
+
+# Package directory, for the reloader's template/static watch list
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set once the background prerender of today's image has been started
+_prerender_started = False
+
+# Worker threads for overlapping the slow (network-bound) lookups of a page
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="liturgical-web")
+
+# Background reflection generation (LLM calls) has its own single worker, so
+# slow OpenAI requests never hold up the page lookups above
+reflection_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="liturgical-reflection")
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Verse numbers in plain reading text ("1 In the beginning... 2 And the earth...")
+_VERSE_SPLIT_RE = re.compile(r'(\d+ )')
+_VERSE_NUMBER_RE = re.compile(r'^\d+ $')
+
+# Verse markup segments used by format_reading_html: number and first words
+# kept together in a nowrap span, followed by the rest of the verse
+_VERSE_OPEN = '<span class="verse"><span class="nowrap"><span class="verse-number">'
+_VERSE_NUMBER_CLOSE = '</span> '
+_VERSE_NOWRAP_CLOSE = '</span>'
+_VERSE_CLOSE = '</span>'
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson.
+    
+    Dates and other non-native types still go through the default provider's
+    conversion and keys stay sorted, so responses match plain jsonify().
+    """
+    
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Custom json.dumps arguments (indent, separators, ...) need the stdlib
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+# Browser cache lifetime for per-date images and artwork
+FILE_MAX_AGE = 3600
+
+# Browser cache lifetime for /static files in production
+STATIC_MAX_AGE = 7 * 86400
+
+# Browser cache lifetime for successfully parsed reading text (scripture doesn't change)
+READING_MAX_AGE = 86400
+
+def seconds_until_midnight() -> int:
+    """Seconds left until the local date rolls over."""
+    now = datetime.now()
+    return int((datetime.combine(now.date() + timedelta(days=1), time.min) - now).total_seconds())
+
+def send_cacheable_file(path, mimetype, max_age=FILE_MAX_AGE):
+    """Send a file with Cache-Control max-age plus ETag/Last-Modified validators.
+    
+    send_file answers If-None-Match / If-Modified-Since with a 304.
+    """
+    return send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=max_age)
+
+# Days, starting today, whose Wikipedia summaries prerender_today fetches
+PREWARM_DAYS = 3
+
+def prerender_today(schedule_next=True):
+    """Render today's PNG and BMP, prewarm summaries and queue the reflection; re-run after midnight."""
+    today_date = date.today()
+    for fmt in ('png', 'bmp'):
+        try:
+            data_service.generate_image(today_date, fmt)
+        except Exception as e:
+            log("[web_server.py] Could not prerender %s image for %s: %s", fmt, today_date, e)
+    
+    # Pages fall back to the Wikipedia summary while a reflection is pending,
+    # so fetch the summaries for the next few days in one concurrent batch
+    try:
+        urls = [data_service.get_liturgical_data(today_date + timedelta(days=i)).get('url')
+                for i in range(PREWARM_DAYS)]
+        wikipedia_service.get_summaries([url for url in urls if url])
+    except Exception as e:
+        log("[web_server.py] Could not prewarm Wikipedia summaries: %s", e)
+    
+    # Generated once across workers (see queue_reflection), no-op if cached
+    if data_service.get_cached_reflection(today_date) is None:
+        queue_reflection(today_date)
+    
+    if schedule_next:
+        # A few seconds past midnight, so date.today() has rolled over
+        timer = threading.Timer(seconds_until_midnight() + 5, prerender_today)
+        timer.daemon = True
+        timer.start()
+
+def get_failed_reflection(target_date):
+    """Return the recent fallback reflection for a date whose generation failed, if any."""
+    with _pending_reflections_lock:
+        entry = _failed_reflections.get(target_date)
+        if entry is None:
+            return None
+        if datetime.now() - entry[0] > FAILED_REFLECTION_RETRY:
+            del _failed_reflections[target_date]
+            return None
+        return entry[1]
+
+def get_ready_reflection(target_date):
+    """Return a date's generated (or recently failed) reflection without calling the LLM."""
+    reflection = data_service.get_cached_reflection(target_date)
+    if reflection is None:
+        reflection = get_failed_reflection(target_date)
+    return reflection
+
+def _generate_reflection(target_date):
+    """Generate and cache one reflection, recording a fallback result."""
+    try:
+        # Worker processes share the disk cache: hold a lock file while
+        # generating, so a reflection another worker is already generating is
+        # read from the cache afterwards instead of being paid for twice
+        with open(os.path.join(data_service.cache_dir, 'reflections', '.generate.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            reflection = data_service.get_reflection(target_date)
+        if reflection.get('fallback'):
+            # Fallbacks aren't cached on disk; remember them for a while
+            with _pending_reflections_lock:
+                _failed_reflections[target_date] = (datetime.now(), reflection)
+                _failed_reflections.move_to_end(target_date)
+                while len(_failed_reflections) > FAILED_REFLECTION_CACHE_SIZE:
+                    _failed_reflections.popitem(last=False)
+    except Exception as e:
+        log("[web_server.py] ERROR generating reflection for %s: %s", target_date, e)
+    finally:
+        with _pending_reflections_lock:
+            _pending_reflections.discard(target_date)
+
+def queue_reflection(target_date):
+    """Generate a date's reflection in the background, at most once at a time per date.
+    
+    Returns:
+        False if the queue is full and the date could not be queued
+    """
+    with _pending_reflections_lock:
+        if target_date in _pending_reflections:
+            return True
+        if len(_pending_reflections) >= MAX_PENDING_REFLECTIONS:
+            return False
+        _pending_reflections.add(target_date)
+    
+    reflection_executor.submit(_generate_reflection, target_date)
+    return True
+
+def load_web_config(config=None):
+    """Return the given config, or load it (falling back to defaults).
+    
+    Settings in the config file's web_server section override top-level ones.
+    """
+    if config is not None:
+        return config
+    # Load web server config
+    try:
+        config = load_config()
+        return {**config, **(config.get('web_server') or {})}
+    except FileNotFoundError:
+        # Fallback to default config
+        return {
+            'host': '0.0.0.0',
+            'port': 8080,
+            'debug': False,
+            'auto_reload': False
+        }
+
 def create_app(config=None):
     """Create and configure the Flask application."""
-    if config is None:
-        # Load web server config
-        config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yml')
-        try:
-            with open(config_path) as f:
-                config = yaml.safe_load(f)
-        except FileNotFoundError:
-            # Fallback to default config
-            config = {
-                'host': '0.0.0.0',
-                'port': 8080,
-                'debug': False,
-                'auto_reload': False
-            }
+    config = load_web_config(config)
     
     # Configure Flask app
+    if orjson is not None:
+        # jsonify() and the JSON error handlers serialize with orjson
+        app.json = OrjsonProvider(app)
     app.config['HOST'] = config.get('host', '0.0.0.0')
     app.config['PORT'] = config.get('port', 8080)
     app.config['DEBUG'] = config.get('debug', False)
     app.config['AUTO_RELOAD'] = config.get('auto_reload', False)
+    # Behind a front end with X-Sendfile support (Apache mod_xsendfile,
+    # lighttpd), send_file() only sets the header and the front end streams
+    # the image/artwork bytes itself
+    app.config['USE_X_SENDFILE'] = config.get('x_sendfile', False)
+    # /static only holds the page fonts, which change on deploy; let browsers
+    # keep them for a week instead of revalidating on every page view
+    if not app.config['AUTO_RELOAD']:
+        app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
     
     # Initialize data service with config
     global data_service
@@ -62,6 +275,9 @@ def create_app(config=None):
         else:
             raise
     
+    global wikipedia_service
+    wikipedia_service = WikipediaService(cache_dir=data_service.cache_dir)
+    
     # Add context processor for current time and data service
     @app.context_processor
     def inject_current_time():
@@ -71,8 +287,54 @@ def create_app(config=None):
             'data_service': data_service
         }
     
+    if not app.config['AUTO_RELOAD']:
+        # Templates only change on deploy: skip the per-render mtime check,
+        # keep compiled bytecode across restarts and compile everything now
+        # rather than on each worker's first request
+        jinja_cache_dir = Path(data_service.cache_dir) / "jinja"
+        jinja_cache_dir.mkdir(parents=True, exist_ok=True)
+        app.jinja_env.auto_reload = False
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(jinja_cache_dir))
+        for template_name in ('base.html', 'index.html', 'date.html'):
+            app.jinja_env.get_template(template_name)
+    
+    # Today's image is rendered in the background now and after each midnight,
+    # so the first /api/image/today request of the day doesn't pay for it
+    # (not in the reloader's watcher process, which never serves requests)
+    global _prerender_started
+    in_reloader_parent = app.config['AUTO_RELOAD'] and not os.environ.get('WERKZEUG_RUN_MAIN')
+    if not _prerender_started and not in_reloader_parent:
+        _prerender_started = True
+        threading.Thread(target=prerender_today, name="liturgical-prerender", daemon=True).start()
+    
     return app
 
+# Text responses worth gzipping; images are already compressed and are
+# streamed with send_file, so they are left alone
+COMPRESS_MIMETYPES = frozenset(('application/json', 'text/html'))
+COMPRESS_MIN_SIZE = 500
+COMPRESS_LEVEL = 4
+
+@app.after_request
+def compress_response(response):
+    """Gzip JSON and HTML responses for clients that accept it."""
+    if (response.direct_passthrough
+            or response.status_code != 200
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    # Quality lookup, so "gzip;q=0" counts as a refusal
+    if not request.accept_encodings['gzip']:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 @app.route('/')
 def index():
     """Home page with navigation."""
@@ -84,90 +346,70 @@ def index():
     if date_param:
         try:
             # Validate the date format
-            parsed_date = datetime.strptime(date_param, '%Y-%m-%d').date()
+            parsed_date = date.fromisoformat(date_param)
             # Redirect to the date-specific page
-            return redirect(f'/date/{date_param}')
+            return redirect(f'/date/{parsed_date.isoformat()}')
         except ValueError:
             # If invalid date, just render the index page
             pass
     
-    return render_template('index.html', today=date.today().strftime('%Y-%m-%d'))
+    return render_template('index.html', today=date.today().isoformat())
+
+def render_date_page(target_date):
+    """Render the liturgical information page for a date.
+    
+    Only an already-generated reflection is shown. Otherwise its generation
+    is queued in the background and the page falls back to the Wikipedia
+    summary, so rendering never waits on the LLM. The artwork lookup runs in
+    a worker thread while the liturgical data is fetched.
+    """
+    artwork_future = executor.submit(data_service.get_artwork_info, target_date)
+    
+    liturgical_data = data_service.get_liturgical_data(target_date)
+    wikipedia_summary = None
+    
+    reflection = get_ready_reflection(target_date)
+    reflection_pending = False
+    if reflection is None:
+        reflection_pending = queue_reflection(target_date)
+        # Fall back to Wikipedia summary until the reflection is ready
+        if liturgical_data.get('url'):
+            wikipedia_summary = wikipedia_service.get_summary(liturgical_data['url'])
+    
+    # Get artwork info for this date
+    artwork_info = artwork_future.result()
+    
+    # Get next artwork info if no artwork for this date
+    next_artwork_info = None
+    if not artwork_info:
+        next_artwork_info = data_service.get_next_artwork_info(target_date)
+    
+    return render_template('date.html', 
+                         data=liturgical_data, 
+                         wikipedia_summary=wikipedia_summary,
+                         reflection=reflection,
+                         reflection_pending=reflection_pending,
+                         date=target_date,
+                         artwork_info=artwork_info,
+                         next_artwork=next_artwork_info)
 
 @app.route('/today')
 def today():
     """Today's liturgical information page."""
     try:
-        today_date = date.today()
-        liturgical_data = data_service.get_liturgical_data(today_date)
-        wikipedia_summary = None
-        reflection = None
-        
-        # Try to get reflection first
-        try:
-            reflection = data_service.get_reflection(today_date)
-        except Exception as e:
-            log(f"[web_server.py] Could not generate reflection: {e}")
-            # Fall back to Wikipedia summary if reflection fails
-            if liturgical_data.get('url'):
-                wikipedia_summary = wikipedia_service.get_summary(liturgical_data['url'])
-        
-        # Get artwork info for today
-        artwork_info = data_service.get_artwork_info(today_date)
-        
-        # Get next artwork info if no artwork for today
-        next_artwork_info = None
-        if not artwork_info:
-            next_artwork_info = data_service.get_next_artwork_info(today_date)
-        
-        return render_template('date.html', 
-                             data=liturgical_data, 
-                             wikipedia_summary=wikipedia_summary,
-                             reflection=reflection,
-                             date=today_date,
-                             artwork_info=artwork_info,
-                             next_artwork=next_artwork_info)
-    except Exception as e:
-        logger.error(f"Error rendering today page: {e}")
+        return render_date_page(date.today())
+    except Exception:
+        logger.exception("Error rendering today page")
         abort(500)
 
 @app.route('/date/<date_str>')
 def date_page(date_str):
     """Liturgical information page for a specific date."""
+    target_date = route_date_or_400(date_str)
     try:
-        # Parse date string (format: YYYY-MM-DD)
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        liturgical_data = data_service.get_liturgical_data(parsed_date)
-        wikipedia_summary = None
-        reflection = None
-        
-        # Try to get reflection first
-        try:
-            reflection = data_service.get_reflection(parsed_date)
-        except Exception as e:
-            log(f"[web_server.py] Could not generate reflection: {e}")
-            # Fall back to Wikipedia summary if reflection fails
-            if liturgical_data.get('url'):
-                wikipedia_summary = wikipedia_service.get_summary(liturgical_data['url'])
-        
-        # Get artwork info for this date
-        artwork_info = data_service.get_artwork_info(parsed_date)
-        
-        # Get next artwork info if no artwork for this date
-        next_artwork_info = None
-        if not artwork_info:
-            next_artwork_info = data_service.get_next_artwork_info(parsed_date)
-        
-        return render_template('date.html', 
-                             data=liturgical_data, 
-                             wikipedia_summary=wikipedia_summary,
-                             reflection=reflection,
-                             date=parsed_date,
-                             artwork_info=artwork_info,
-                             next_artwork=next_artwork_info)
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error rendering date page for {date_str}: {e}")
+        return render_date_page(target_date)
+    except Exception:
+        logger.exception("Error rendering date page for %s", date_str)
         abort(500)
 
 @app.route('/api/today')
@@ -177,153 +419,98 @@ def api_today():
         today_date = date.today()
         liturgical_data = data_service.get_liturgical_data(today_date)
         return jsonify(liturgical_data)
-    except Exception as e:
-        logger.error(f"Error getting today's data: {e}")
+    except Exception:
+        logger.exception("Error getting today's data")
         abort(500)
 
 @app.route('/api/info/<date_str>')
 def api_date_info(date_str):
     """API endpoint for liturgical data for a specific date."""
+    target_date = route_date_or_400(date_str)
     try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        liturgical_data = data_service.get_liturgical_data(parsed_date)
+        liturgical_data = data_service.get_liturgical_data(target_date)
         return jsonify(liturgical_data)
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error getting data for {date_str}: {e}")
+    except Exception:
+        logger.exception("Error getting data for %s", date_str)
         abort(500)
 
-@app.route('/api/image/today/png')
-def api_today_png():
-    """API endpoint for today's liturgical image in PNG format."""
-    try:
-        today_date = date.today()
-        image_path = data_service.generate_image(today_date, 'png')
-        return send_file(image_path, mimetype='image/png')
-    except Exception as e:
-        logger.error(f"Error generating today's PNG: {e}")
-        abort(500)
+# Image formats served by /api/image/<date>/<fmt>
+IMAGE_MIMETYPES = {'png': 'image/png', 'bmp': 'image/bmp'}
 
-@app.route('/api/image/today/bmp')
-def api_today_bmp():
-    """API endpoint for today's liturgical image in BMP format."""
-    try:
-        today_date = date.today()
-        image_path = data_service.generate_image(today_date, 'bmp')
-        return send_file(image_path, mimetype='image/bmp')
-    except Exception as e:
-        logger.error(f"Error generating today's BMP: {e}")
-        abort(500)
+def parse_route_date(date_str: str) -> date:
+    """Parse a date route segment: 'today' or YYYY-MM-DD (raises ValueError)."""
+    if date_str == 'today':
+        return date.today()
+    return date.fromisoformat(date_str)
 
-@app.route('/api/image/<date_str>/png')
-def api_date_png(date_str):
-    """API endpoint for liturgical image in PNG format for a specific date."""
+def route_date_or_400(date_str: str) -> date:
+    """Parse a date route segment, aborting with 400 if it's invalid."""
     try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        image_path = data_service.generate_image(parsed_date, 'png')
-        return send_file(image_path, mimetype='image/png')
+        return parse_route_date(date_str)
     except ValueError:
         abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error generating PNG for {date_str}: {e}")
-        abort(500)
 
-@app.route('/api/image/<date_str>/bmp')
-def api_date_bmp(date_str):
-    """API endpoint for liturgical image in BMP format for a specific date."""
-    try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        image_path = data_service.generate_image(parsed_date, 'bmp')
-        return send_file(image_path, mimetype='image/bmp')
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error generating BMP for {date_str}: {e}")
-        abort(500)
+def file_max_age(date_str: str) -> int:
+    """Browser cache lifetime for a date's files; today's expire at midnight."""
+    return seconds_until_midnight() if date_str == 'today' else FILE_MAX_AGE
 
-@app.route('/api/artwork/today')
-def api_today_artwork():
-    """API endpoint for today's liturgical artwork."""
+@app.route('/api/image/<date_str>/<fmt>')
+def api_image(date_str, fmt):
+    """API endpoint for the liturgical image ('today' or YYYY-MM-DD) in PNG or BMP format."""
+    mimetype = IMAGE_MIMETYPES.get(fmt)
+    if mimetype is None:
+        abort(404)
+    target_date = route_date_or_400(date_str)
     try:
-        today_date = date.today()
-        artwork_path = data_service.get_artwork_path(today_date)
-        if artwork_path:
-            return send_file(artwork_path, mimetype='image/jpeg')
-        else:
-            abort(404, description="No artwork available for today")
-    except Exception as e:
-        logger.error(f"Error serving today's artwork: {e}")
+        image_path = data_service.generate_image(target_date, fmt)
+    except Exception:
+        logger.exception("Error generating %s for %s", fmt.upper(), date_str)
         abort(500)
+    return send_cacheable_file(image_path, mimetype, max_age=file_max_age(date_str))
 
 @app.route('/api/artwork/<date_str>')
-def api_date_artwork(date_str):
-    """API endpoint for liturgical artwork for a specific date."""
-    try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        artwork_path = data_service.get_artwork_path(parsed_date)
-        if artwork_path:
-            return send_file(artwork_path, mimetype='image/jpeg')
-        else:
-            abort(404, description=f"No artwork available for {date_str}")
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error serving artwork for {date_str}: {e}")
-        abort(500)
-
-@app.route('/api/next-artwork/today')
-def api_today_next_artwork():
-    """API endpoint for next artwork when no artwork is available for today."""
-    try:
-        today_date = date.today()
-        next_artwork_info = data_service.get_next_artwork_info(today_date)
-        if next_artwork_info and next_artwork_info.get('cached_file'):
-            return send_file(next_artwork_info['cached_file'], mimetype='image/jpeg')
-        else:
-            abort(404, description="No next artwork available")
-    except Exception as e:
-        logger.error(f"Error serving next artwork for today: {e}")
-        abort(500)
+def api_artwork(date_str):
+    """API endpoint for the liturgical artwork for 'today' or a specific date."""
+    target_date = route_date_or_400(date_str)
+    artwork_path = data_service.get_artwork_path(target_date)
+    if not artwork_path:
+        abort(404, description=f"No artwork available for {date_str}")
+    return send_cacheable_file(artwork_path, 'image/jpeg', max_age=file_max_age(date_str))
 
 @app.route('/api/next-artwork/<date_str>')
-def api_date_next_artwork(date_str):
-    """API endpoint for next artwork when no artwork is available for a specific date."""
-    try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        next_artwork_info = data_service.get_next_artwork_info(parsed_date)
-        if next_artwork_info and next_artwork_info.get('cached_file'):
-            return send_file(next_artwork_info['cached_file'], mimetype='image/jpeg')
-        else:
-            abort(404, description=f"No next artwork available for {date_str}")
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error serving next artwork for {date_str}: {e}")
-        abort(500)
-
-@app.route('/api/reflection/today')
-def api_today_reflection():
-    """API endpoint for today's liturgical reflection."""
-    try:
-        today_date = date.today()
-        reflection = data_service.get_reflection(today_date)
-        return jsonify(reflection)
-    except Exception as e:
-        logger.error(f"Error getting today's reflection: {e}")
-        abort(500)
+def api_next_artwork(date_str):
+    """API endpoint for next artwork when no artwork is available for 'today' or a specific date."""
+    target_date = route_date_or_400(date_str)
+    next_artwork_info = data_service.get_next_artwork_info(target_date)
+    if not (next_artwork_info and next_artwork_info.get('cached_file')):
+        abort(404, description=f"No next artwork available for {date_str}")
+    return send_cacheable_file(next_artwork_info['cached_file'], 'image/jpeg', max_age=file_max_age(date_str))
 
 @app.route('/api/reflection/<date_str>')
-def api_date_reflection(date_str):
-    """API endpoint for liturgical reflection for a specific date."""
+def api_reflection(date_str):
+    """API endpoint for the liturgical reflection for 'today' or a specific date.
+    
+    Only already-generated reflections are returned; otherwise generation is
+    queued in the background and the client is asked to retry (202, or 503
+    while the queue is full). If the last generation failed, its fallback
+    reflection is returned instead.
+    """
+    target_date = route_date_or_400(date_str)
     try:
-        parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        reflection = data_service.get_reflection(parsed_date)
+        reflection = get_ready_reflection(target_date)
+        if reflection is None:
+            if queue_reflection(target_date):
+                response = jsonify({'status': 'pending', 'date': target_date.isoformat()})
+                response.status_code = 202
+                response.headers['Retry-After'] = '5'
+            else:
+                response = jsonify({'status': 'busy', 'date': target_date.isoformat()})
+                response.status_code = 503
+                response.headers['Retry-After'] = '30'
+            return response
         return jsonify(reflection)
-    except ValueError:
-        abort(400, description="Invalid date format. Use YYYY-MM-DD")
-    except Exception as e:
-        logger.error(f"Error getting reflection for {date_str}: {e}")
+    except Exception:
+        logger.exception("Error getting reflection for %s", date_str)
         abort(500)
 
 @app.route('/api/tokens')
@@ -335,18 +522,28 @@ def api_token_usage():
             'tokens_used': tokens_used,
             'estimated_cost_usd': round(tokens_used * 0.00015 / 1000, 4)  # Rough estimate for gpt-4o-mini
         })
-    except Exception as e:
-        logger.error(f"Error getting token usage: {e}")
+    except Exception:
+        logger.exception("Error getting token usage")
         abort(500)
 
+@functools.lru_cache(maxsize=512)
 def format_reading_html(plain_text: str) -> str:
-    """Format plain text reading with HTML structure for display."""
-    if not plain_text or plain_text.startswith('[Reading:'):
+    """Format plain text reading with HTML structure for display.
+    
+    Pure string transform, so results are memoized for repeated readings.
+    """
+    if not plain_text:
+        return plain_text
+    
+    # The result is inserted as HTML, so escape the text once up front; this
+    # includes "[Reading: <reference>]" placeholders, whose reference can
+    # come straight from the request URL
+    plain_text = html.escape(plain_text, quote=False)
+    if plain_text.startswith('[Reading:'):
         return plain_text
     
-    import re
     # Split by verse numbers (digits followed by space)
-    parts = re.split(r'(\d+ )', plain_text)
+    parts = _VERSE_SPLIT_RE.split(plain_text)
     
     if len(parts) < 2:
         return plain_text
@@ -354,21 +551,27 @@ def format_reading_html(plain_text: str) -> str:
     formatted_parts = []
     i = 0
     while i < len(parts):
-        if i + 1 < len(parts) and re.match(r'^\d+ $', parts[i]):
+        if i + 1 < len(parts) and _VERSE_NUMBER_RE.match(parts[i]):
             # This is a verse number
             verse_num = parts[i].strip()
             verse_text = parts[i + 1] if i + 1 < len(parts) else ""
             
-            # Split verse text into words
-            words = verse_text.split()
+            # Only the first two words are needed separately (they are kept on
+            # the verse number's line), so split off just those; whitespace
+            # runs and newlines in the rest are collapsed to single spaces
+            words = verse_text.split(None, 2)
             if len(words) >= 2:
-                first_two_words = f"{words[0]} {words[1]}"
-                remaining_words = " ".join(words[2:]) if len(words) > 2 else ""
-                remaining_text = f" {remaining_words}" if remaining_words else ""
-                
-                formatted_verse = f'<span class="verse"><span class="nowrap"><span class="verse-number">{verse_num}</span> {first_two_words}</span>{remaining_text}</span>'
+                remaining_words = " ".join(words[2].split()) if len(words) > 2 else ""
+                formatted_verse = ''.join((
+                    _VERSE_OPEN, verse_num, _VERSE_NUMBER_CLOSE,
+                    words[0], ' ', words[1], _VERSE_NOWRAP_CLOSE,
+                    ' ' if remaining_words else '', remaining_words, _VERSE_CLOSE
+                ))
             else:
-                formatted_verse = f'<span class="verse"><span class="nowrap"><span class="verse-number">{verse_num}</span> {verse_text}</span></span>'
+                formatted_verse = ''.join((
+                    _VERSE_OPEN, verse_num, _VERSE_NUMBER_CLOSE,
+                    verse_text, _VERSE_NOWRAP_CLOSE, _VERSE_CLOSE
+                ))
             
             formatted_parts.append(formatted_verse)
             i += 2
@@ -395,22 +598,64 @@ def api_reading_content(reading_reference):
         if reading_contents and len(reading_contents) > 0:
             plain_text = reading_contents[0].get('text', 'Content not available')
             formatted_text = format_reading_html(plain_text)
-            return jsonify({
+            response = jsonify({
                 'reference': reading_reference,
                 'text': formatted_text
             })
+            if reading_contents[0].get('parsed'):
+                # Repeat views are then served by the browser; the service
+                # itself already keeps parsed passages in memory and on disk
+                response.cache_control.public = True
+                response.cache_control.max_age = READING_MAX_AGE
+            return response
         else:
             return jsonify({
                 'reference': reading_reference,
                 'text': 'Reading content not available'
             })
-    except Exception as e:
-        logger.error(f"Error getting reading content for {reading_reference}: {e}")
+    except Exception:
+        logger.exception("Error getting reading content for %s", reading_reference)
         return jsonify({
             'reference': reading_reference,
             'text': 'Error loading reading content'
         }), 500
 
+def reading_payload(content):
+    """JSON-ready form of one entry from ScripturaService.get_reading_contents."""
+    if not isinstance(content, dict):
+        return {'reference': content, 'text': 'Reading content not available', 'parsed': False}
+    if content.get('is_alternative'):
+        return {
+            'reference': content['reference'],
+            'alternatives': [reading_payload(alt) for alt in content['alternatives']]
+        }
+    return {
+        'reference': content['reference'],
+        'text': format_reading_html(content.get('text')) or 'Reading content not available',
+        'parsed': content.get('parsed', False)
+    }
+
+# Most references accepted by one /api/readings request, so a single request
+# can't fan out into an unbounded number of Scriptura lookups
+MAX_BATCH_READINGS = 20
+
+@app.route('/api/readings', methods=['POST'])
+def api_readings_content():
+    """API endpoint for fetching several readings at once: {"refs": ["John 3:16", ...]}."""
+    payload = request.get_json(silent=True) or {}
+    refs = payload.get('refs')
+    if not isinstance(refs, list) or not all(isinstance(ref, str) for ref in refs):
+        abort(400, description='Expected a JSON body like {"refs": ["John 3:16"]}')
+    if len(refs) > MAX_BATCH_READINGS:
+        abort(400, description=f"At most {MAX_BATCH_READINGS} references per request")
+    try:
+        # One call, so the references are fetched concurrently and deduplicated
+        reading_contents = data_service.scriptura_service.get_reading_contents(refs)
+        return jsonify([reading_payload(content) for content in reading_contents])
+    except Exception:
+        logger.exception("Error getting reading contents for %s", refs)
+        abort(500)
+
 @app.route('/api/versions')
 def api_versions():
     """API endpoint for getting available Bible versions."""
@@ -420,8 +665,8 @@ def api_versions():
         
         versions = scriptura_service.get_available_versions()
         return jsonify(versions)
-    except Exception as e:
-        logger.error(f"Error getting available versions: {e}")
+    except Exception:
+        logger.exception("Error getting available versions")
         return jsonify({'error': 'Failed to fetch versions'}), 500
 
 @app.errorhandler(400)
@@ -440,26 +685,61 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 def run_web_server(config=None):
-    """Run the web server."""
-    app = create_app(config)
+    """Run the web server.
+    
+    With gunicorn: true (and gunicorn installed, auto_reload and debug off),
+    this process is replaced by gunicorn, whose workers load the config file
+    named by LITURGICAL_CONFIG (default config.yml). An explicit config dict
+    can't be handed to them, so passing one runs Flask's threaded server
+    instead, as does the default configuration: a gunicorn master plus
+    worker doesn't fit the service's 64MB systemd memory limit.
+    """
+    explicit_config = config is not None
+    config = load_web_config(config)
+    host = config.get('host', '0.0.0.0')
+    port = config.get('port', 8080)
+    debug = config.get('debug', False)
+    auto_reload = config.get('auto_reload', False)
     
-    host = app.config['HOST']
-    port = app.config['PORT']
-    debug = app.config['DEBUG']
-    auto_reload = app.config['AUTO_RELOAD']
+    log("[web_server.py] Starting web server on %s:%s (debug=%s, auto_reload=%s)", host, port, debug, auto_reload)
     
-    log(f"[web_server.py] Starting web server on {host}:{port} (debug={debug}, auto_reload={auto_reload})")
+    use_gunicorn = config.get('gunicorn', False) and not auto_reload and not debug and not explicit_config
+    if use_gunicorn and importlib.util.find_spec('gunicorn') is None:
+        log("[web_server.py] gunicorn is enabled but not installed; using the built-in server")
+        use_gunicorn = False
+    if use_gunicorn:
+        workers = config.get('workers', 1)
+        threads = config.get('threads', 4)
+        log_level = str(config.get('log_level', 'info')).lower()
+        print(f"Production mode: gunicorn with {workers} worker(s) x {threads} thread(s)")
+        # The workers re-read the same config file, by absolute path in case
+        # gunicorn changes directory
+        env = dict(os.environ)
+        env['LITURGICAL_CONFIG'] = os.path.abspath(env.get('LITURGICAL_CONFIG', 'config.yml'))
+        # Replace this process before any services exist; each gunicorn worker
+        # builds its own app (and connections) from liturgical_display.wsgi
+        os.execve(sys.executable, [
+            sys.executable, '-m', 'gunicorn',
+            '-w', str(workers), '-k', 'gthread', '--threads', str(threads),
+            '-b', f"{host}:{port}",
+            '--log-level', log_level,
+            'liturgical_display.wsgi:application'
+        ], env)
+    
+    app = create_app(config)
     
     if auto_reload:
         print(f"Auto-reloader enabled: True")
-        print(f"Watching for changes in: {os.path.dirname(os.path.abspath(__file__))}")
-        app.run(host=host, port=port, debug=True, use_reloader=True, extra_files=[
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates'),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
-        ])
+        print(f"Watching for changes in: {_MODULE_DIR}")
+        # The reloader compares mtimes of the listed paths, so list the files
+        # themselves; a directory's mtime doesn't change when a file is edited
+        extra_files = glob.glob(os.path.join(_MODULE_DIR, 'templates', '*.html'))
+        extra_files += [path for path in glob.glob(os.path.join(_MODULE_DIR, 'static', '**', '*'), recursive=True)
+                        if os.path.isfile(path)]
+        app.run(host=host, port=port, debug=True, use_reloader=True, extra_files=extra_files)
     else:
-        print(f"Production mode: debug=False, auto_reload=False")
-        app.run(host=host, port=port, debug=False, use_reloader=False)
+        print(f"Production mode: debug={debug}, auto_reload=False")
+        app.run(host=host, port=port, debug=debug, use_reloader=False, threaded=True)
 
 if __name__ == "__main__":
     run_web_server() 
\ No newline at end of file
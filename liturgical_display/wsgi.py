@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for running the web server under gunicorn.
+
+    gunicorn -k gthread --threads 4 -b 0.0.0.0:8080 liturgical_display.wsgi:application
+
+Don't use --preload: importing this module builds the services, and each
+worker should open its own HTTP sessions after the fork.
+"""
+
+from .web_server import create_app
+
+application = create_app()
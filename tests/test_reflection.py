@@ -7,78 +7,137 @@ This script tests the reflection functionality without requiring a full web serv
 
 import os
 import sys
-from datetime import date
+import json
+import argparse
+from datetime import date, timedelta
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the project root to Python path (once, even if this module is loaded again)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
-from liturgical_display.services.data_service import DataService
+from liturgical_display.utils import load_config, write_json_atomic
 
-def test_reflection():
-    """Test the reflection generation functionality."""
+# gpt-4o-mini input price: $0.15 per million tokens
+_COST_PER_TOKEN_USD = 1.5e-7
+
+# Header and sub-section separators for the printed results
+_H = "=" * 50
+_SUB = "-" * 30
+
+# API keys the test needs: (config.yml key, environment variable, label).
+# Scriptura is a free local API and needs no key.
+_API_KEYS = (
+    ("openai_api_key", "OPENAI_API_KEY", "OpenAI"),
+)
+
+def _resolve_api_keys(config):
+    """Look up each key in _API_KEYS, preferring config.yml over the environment."""
+    config = config or {}
+    return {name: config.get(name) or os.getenv(env_var) for name, env_var, _ in _API_KEYS}
+
+def _record_token_usage(usage_path, session_tokens):
+    """Add this session's tokens to the lifetime total in usage_path and return the new total."""
+    try:
+        with open(usage_path, 'r') as f:
+            previous = json.load(f).get('total', 0)
+    except (FileNotFoundError, ValueError):
+        previous = 0
+    
+    total = previous + session_tokens
+    try:
+        write_json_atomic(usage_path, {'total': total})
+    except OSError as e:
+        print(f"⚠️  Could not save token usage: {e}")
+    return total
+
+def test_reflection(days=1, batch=False, quiet=False):
+    """Test the reflection generation functionality for today and the following days.
+
+    With batch=True, reflections are requested through the OpenAI Batch API
+    (half price, but each batch may take a long time to complete). With
+    quiet=True, each reflection is reported as a single "ok <date>" line.
+    """
     print("Testing Liturgical Reflection Generator")
-    print("=" * 50)
+    print(_H)
     
-    # Load config if available
+    # Load config if available (LITURGICAL_CONFIG, default config.yml)
     config = None
-    config_path = 'config.yml'
-    if os.path.exists(config_path):
-        try:
-            import yaml
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            print(f"✅ Loaded config from {config_path}")
-        except Exception as e:
-            print(f"⚠️  Could not load config: {e}")
-    
-    # Check for OpenAI API key in config or environment
-    openai_key = None
-    
-    if config:
-        openai_key = config.get('openai_api_key')
-    
-    if not openai_key:
-        openai_key = os.getenv('OPENAI_API_KEY')
+    config_path = os.environ.get('LITURGICAL_CONFIG', 'config.yml')
+    try:
+        config = load_config(config_path)
+        print(f"✅ Loaded config from {config_path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️  Could not load config: {e}")
     
-    if not openai_key:
-        print("❌ OpenAI API key not found")
-        print("   Set it in config.yml or as environment variable OPENAI_API_KEY")
-        return False
+    # Check for API keys in config or environment
+    keys = _resolve_api_keys(config)
+    for name, env_var, label in _API_KEYS:
+        if not keys[name]:
+            print(f"❌ {label} API key not found")
+            print(f"   Set it in config.yml or as environment variable {env_var}")
+            return False
     
     print("✅ Scriptura API is free and doesn't require an API key")
     
     try:
-        # Initialize data service with config
+        # Initialize data service with config (imported only now, so the
+        # missing-key exit above doesn't load the service and OpenAI SDK modules)
         print("Initializing data service...")
+        from liturgical_display.services.data_service import DataService
         data_service = DataService(config=config)
         
-        # Test with today's date
+        # Test with today's date (and the following days, if requested)
         today = date.today()
-        print(f"Testing reflection for {today}")
+        today_iso = today.isoformat()
+        dates = [today + timedelta(days=i) for i in range(days)]
+        print(f"Testing reflection for {today_iso}" + (f" and the next {days - 1} day(s)" if days > 1 else ""))
         
-        # Get reflection
-        print("Generating reflection...")
-        reflection = data_service.get_reflection(today)
+        if batch:
+            # Batch API: cheaper, but blocks until each batch completes
+            print("Generating reflection via the Batch API (this may take a while)...")
+            reflections = {d: data_service.get_reflection_batch(d) for d in dates}
+        else:
+            # Get reflections (uncached ones are generated concurrently)
+            print("Generating reflection...")
+            reflections = data_service.get_reflections(dates)
         
-        # Display results
-        print("\n" + "=" * 50)
-        print("REFLECTION RESULTS")
-        print("=" * 50)
-        print(f"Date: {reflection['date']}")
-        print(f"Season: {reflection['season']}")
-        print(f"Title: {reflection['title']}")
-        print(f"Tokens Used: {reflection.get('tokens_used', 'N/A')}")
-        print(f"Generated At: {reflection.get('generated_at', 'N/A')}")
-        print(f"Fallback: {reflection.get('fallback', False)}")
-        print("\nReflection Text:")
-        print("-" * 30)
-        print(reflection['reflection'])
-        print("-" * 30)
+        for reflection in reflections.values():
+            if quiet:
+                print("ok", reflection['date'])
+                continue
+            
+            # Display results (one write for the whole block)
+            lines = [
+                "",
+                _H,
+                "REFLECTION RESULTS",
+                _H,
+                f"Date: {reflection['date']}",
+                f"Season: {reflection['season']}",
+                f"Title: {reflection['title']}",
+                f"Tokens Used: {reflection.get('tokens_used', 'N/A')}",
+                f"Generated At: {reflection.get('generated_at', 'N/A')}",
+                f"Fallback: {reflection.get('fallback', False)}",
+                "",
+                "Reflection Text:",
+                _SUB,
+                reflection['reflection'],
+                _SUB,
+            ]
+            sys.stdout.write("\n".join(lines) + "\n")
         
         # Check token usage
         total_tokens = data_service.get_token_usage()
+        lifetime_tokens = _record_token_usage(
+            os.path.join(data_service.cache_dir, 'token_usage.json'), total_tokens
+        )
         print(f"\nTotal tokens used in session: {total_tokens}")
-        print(f"Estimated cost: ${total_tokens * 0.00015 / 1000:.4f}")
+        print(f"Estimated cost: ${total_tokens * _COST_PER_TOKEN_USD:.4f}")
+        print(f"Total tokens used across runs: {lifetime_tokens}")
+        print(f"Estimated lifetime cost: ${lifetime_tokens * _COST_PER_TOKEN_USD:.4f}")
         
         print("\n✅ Reflection generation test completed successfully!")
         return True
@@ -90,5 +149,14 @@ def test_reflection():
         return False
 
 if __name__ == "__main__":
-    success = test_reflection()
+    parser = argparse.ArgumentParser(description="Test the liturgical reflection generator.")
+    parser.add_argument('--days', type=int, default=1,
+                        help="number of days, starting today, to generate reflections for")
+    parser.add_argument('--batch', action='store_true',
+                        help="use the OpenAI Batch API (half price, slow) instead of streaming")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="print one line per reflection instead of the full text (default when CI is set)")
+    args = parser.parse_args()
+    success = test_reflection(days=max(1, args.days), batch=args.batch,
+                              quiet=args.quiet or os.environ.get('CI', '').lower() not in ('', '0', 'false', 'no'))
     sys.exit(0 if success else 1)